@@ -1,12 +1,56 @@
 import os
 
 import spotify.spotify as spotify
+import youtube.quota as quota
 import youtube.youtube as youtube
 from util.fuzzy_playlist import search_playlist
+from util.jobs import Job
+from util.match_cache import match_cache
+from util.resolver import resolve_concurrently
 
 YOUTUBE = youtube.api_build("youtube", "v3", credentials=youtube.get_creds())
 
 
+def find_video(title, artist):
+    """
+    Gets the YouTube video ID of a song, searching only if it isn't in the match cache.
+    """
+    return match_cache.lookup(
+        "youtube",
+        title,
+        artist,
+        lambda: youtube.get_video_id(YOUTUBE, title, artist),
+    )
+
+
+def find_track(title, artist):
+    """
+    Gets the Spotify URI of a song, searching only if it isn't in the match cache.
+    """
+    return match_cache.lookup(
+        "spotify",
+        title,
+        artist,
+        lambda: spotify.get_song_uri(spotify.get_access_token(), title, artist),
+    )
+
+
+def video_cost(title, artist):
+    """
+    YouTube quota units to find the video of a song, 0 if it is in the match cache.
+    """
+    if match_cache.get("youtube", title, artist)[0]:
+        return 0
+    return quota.cost("youtube.search.list")
+
+
+PLAYLIST_ADD_COST = quota.cost("youtube.playlistItems.insert")
+# Finding or creating the playlist, and loading its items once to check for duplicates
+PLAYLIST_CREATE_COST = quota.cost(
+    "youtube.playlists.list", "youtube.playlists.insert", "youtube.playlistItems.list"
+)
+
+
 def top_artists():
     """
     Gets the user's top 10 artists from Spotify and subscribes to their YouTube channels.
@@ -15,12 +59,79 @@ def top_artists():
     top_artists = spotify.get_top(
         spotify.get_access_token(), "artists", 10, "long_term"
     )
+    # Skip artists already subscribed to, each would cost a 100 unit search
+    subscribed = {
+        channel["name"].lower() for channel in youtube.iter_subscriptions(YOUTUBE)
+    }
+    top_artists = [
+        artist for artist in top_artists if artist["name"].lower() not in subscribed
+    ]
+    top_artists = quota.plan_batch(
+        top_artists,
+        lambda artist: quota.cost(
+            "youtube.search.list", "youtube.subscriptions.insert"
+        ),
+        label="artists",
+    )
     print("Subscribing to artists' YouTube channels...")
     for artist in top_artists:
         youtube.add_subscription(YOUTUBE, artist["name"])
     print("Done!")
 
 
+def add_songs_to_playlist(job, name, public):
+    """
+    Finds the videos of a job's songs and adds them to a YouTube playlist,
+    as many as fit in today's quota. Finished steps are skipped when resuming.
+
+    Args:
+        job (Job): Job with {"title", "artist"} items
+        name (str): Playlist name
+        public (bool): Whether the playlist is public
+    """
+    pending = quota.plan_batch(
+        job.pending(),
+        lambda p: (
+            0
+            if job.is_done(f"resolve:{p[0]}")
+            else video_cost(p[1]["title"], p[1]["artist"])
+        )
+        + PLAYLIST_ADD_COST,
+        0 if job.is_done("playlist") else PLAYLIST_CREATE_COST,
+        "songs",
+    )
+    if not pending:
+        return
+    print("\nCreating YouTube playlist...")
+    playlist_id = job.step(
+        "playlist", lambda: youtube.create_playlist(YOUTUBE, name, public)
+    )
+    print("\nAdding songs to YouTube playlist...")
+    for i, item in pending:
+        video_id = job.step(
+            f"resolve:{i}", lambda: find_video(item["title"], item["artist"])
+        )
+        if not video_id:
+            print(f"Video not found: {item['title']}")
+        elif job.attempt(
+            f"insert:{i}",
+            lambda: youtube.add_video_to_playlist(YOUTUBE, playlist_id, video_id),
+        ):
+            print(f"Added {item['title']}")
+        else:
+            print(f"Error adding {item['title']}")
+            continue  # left pending, retried on the next run
+        job.mark_done(i)
+    finish(job)
+
+
+def finish(job):
+    if job.finish():
+        print("\nDone!")
+    else:
+        print(f"\n{len(job.pending())} songs left, run this again to continue.")
+
+
 def convert_spotify_yt():
     """
     Converts the user's Spotify playlists to YouTube playlists.
@@ -30,23 +141,20 @@ def convert_spotify_yt():
     )
     if searched_playlist:
         print(f"\nYou chose: {searched_playlist['name']}")
-        print("\nGetting Spotify playlist items...")
-        playlist_items = spotify.get_playlist_items(
-            spotify.get_access_token(), searched_playlist["id"], 10
-        )
-        print("\nCreating YouTube playlist...")
-        youtube_playlist_id = youtube.create_playlist(
-            YOUTUBE, searched_playlist["name"], searched_playlist["public"]
+
+        def get_items():
+            print("\nGetting Spotify playlist items...")
+            items = spotify.get_playlist_items(
+                spotify.get_access_token(), searched_playlist["id"], 10
+            )
+            for item in items:
+                match_cache.put("spotify", item["title"], item["artist"], item["uri"])
+            return items
+
+        job = Job.open(f"convert_spotify_yt-{searched_playlist['id']}", get_items)
+        add_songs_to_playlist(
+            job, searched_playlist["name"], searched_playlist["public"]
         )
-        print("\nAdding songs to YouTube playlist...")
-        for item in playlist_items:
-            video_id = youtube.get_video_id(YOUTUBE, item["title"], item["artist"])
-            r = youtube.add_video_to_playlist(YOUTUBE, youtube_playlist_id, video_id)
-            if r == 409:
-                print(f"Error adding {item['title']}")
-            else:
-                print(f"Added {item['title']}")
-        print("\nDone!")
     else:
         print("\nNo playlist selected")
 
@@ -67,14 +175,13 @@ def convert_yt_spotify():
             searched_playlist["name"],
             searched_playlist["public"],
         )
+        print("\nSearching for songs on Spotify...")
+        uris = resolve_concurrently(
+            playlist_items,
+            lambda item: find_track(item["title"], item["artist"]),
+        )
+        uris = [uri for uri in uris if uri]
         print("\nAdding songs to Spotify playlist...")
-        uris = []
-        for item in playlist_items:
-            uri = spotify.get_song_uri(
-                spotify.get_access_token(), item["title"], item["artist"]
-            )
-            if uri:
-                uris.append(uri)
         spotify.add_to_playlist(spotify.get_access_token(), spotify_playlist_id, uris)
         print("\nDone!")
     else:
@@ -85,43 +192,76 @@ def top_tracks():
     """
     Gets the user's top 10 tracks from Spotify and adds them to a YouTube playlist.
     """
-    print("Getting top tracks from Spotify...")
-    top_tracks = spotify.get_top(spotify.get_access_token(), "tracks", 10, "long_term")
-    print("Creating YouTube playlist...")
-    youtube_playlist_id = youtube.create_playlist(
-        YOUTUBE,
-        "Top Tracks",
-        True,
-    )
-    print("Adding songs to YouTube playlist...")
-    for track in top_tracks:
-        video_id = youtube.get_video_id(
-            YOUTUBE, track["name"], track["artists"][0]["name"]
-        )
-        r = youtube.add_video_to_playlist(YOUTUBE, youtube_playlist_id, video_id)
-        if r == 409:
-            print(f"Error adding {track['name']}")
-        else:
-            print(f"Added {track['name']}")
-    print("Done!")
+
+    def get_items():
+        print("Getting top tracks from Spotify...")
+        tracks = spotify.get_top(spotify.get_access_token(), "tracks", 10, "long_term")
+        items = []
+        for track in tracks:
+            artist = track["artists"][0]["name"]
+            match_cache.put("spotify", track["name"], artist, track["uri"])
+            items.append({"title": track["name"], "artist": artist})
+        return items
+
+    add_songs_to_playlist(Job.open("top_tracks", get_items), "Top Tracks", True)
 
 
 def like_saved_songs():
     """
     Gets the user's saved songs from Spotify and likes them on YouTube.
     """
-    saved_songs = spotify.get_new_liked_songs(spotify.get_access_token())
+    job = Job.open(
+        "like_saved_songs",
+        lambda: [
+            {"title": song[0], "artist": song[1]}
+            for song in spotify.get_new_liked_songs(spotify.get_access_token())
+        ],
+    )
+    pending = quota.plan_batch(
+        job.pending(),
+        lambda p: (
+            0
+            if job.is_done(f"resolve:{p[0]}")
+            else video_cost(p[1]["title"], p[1]["artist"])
+        )
+        + quota.cost("youtube.videos.rate"),
+        label="songs",
+    )
     print("Liking songs on YouTube...")
-    for song in saved_songs:
-        youtube.like_video(YOUTUBE, youtube.get_video_id(YOUTUBE, song[0], song[1]))
-        print(f"Liked {song[0]}")
-    print("Done!")
+    for i, song in pending:
+        video_id = job.step(
+            f"resolve:{i}", lambda: find_video(song["title"], song["artist"])
+        )
+        if not video_id:
+            print(f"Video not found: {song['title']}")
+        elif job.attempt(f"like:{i}", lambda: youtube.like_video(YOUTUBE, video_id)):
+            print(f"Liked {song['title']}")
+        else:
+            print(f"Error liking {song['title']}")
+            continue  # left pending, retried on the next run
+        job.mark_done(i)
+    finish(job)
 
 
 def main():
     """
     CLI for Spotify2YouTube.
     """
+    while True:
+        try:
+            menu()
+        except youtube.QuotaExceededError:
+            print("Progress is saved, run the same option again after the reset.")
+        except youtube.IncompleteListError as e:
+            print(f"{e}. Progress is saved, run the same option again.")
+        else:
+            break
+
+
+def menu():
+    """
+    Main menu, returns when the user exits.
+    """
     while True:
         print(
             """Menu:
@@ -159,6 +299,8 @@ def main():
         elif choice == "4":
             like_saved_songs()
         elif choice == "5":
+            spotify.client.print_metrics()
+            match_cache.print_stats()
             break
         else:
             print("\nInvalid choice")
@@ -3,6 +3,7 @@ import logging
 import os
 import secrets
 import threading
+import time
 
 import requests
 from flask import Flask, cli, redirect, request
@@ -25,6 +26,9 @@ scope = spotify_credentials["scope"].replace(" ", "%20")
 f.close()
 
 BASE_API_URL = "https://api.spotify.com"
+TOKEN_URL = "https://accounts.spotify.com/api/token"
+TOKEN_FILE = os.path.join("spotify", "token.json")
+REFRESH_MARGIN = 60  # seconds before expiry to refresh
 APP_URL, SERVER_PORT = "http://localhost", 8888
 
 state = secrets.token_hex(16)
@@ -66,7 +70,7 @@ def callback():
     try:
         auth_code = request.args.get("code")
         r = requests.post(
-            "https://accounts.spotify.com/api/token",
+            TOKEN_URL,
             data={
                 "grant_type": "authorization_code",
                 "code": auth_code,
@@ -77,9 +81,7 @@ def callback():
         )
         if r.status_code != 200:
             raise Exception(f"Status code: {r.status_code}, {r.text}")
-        token = r.json()
-        with open(os.path.join("spotify", "token.json"), "w") as f:
-            json.dump(token, f)
+        token_manager.set(r.json())
         auth_event.set()
         return "Spotify Authorisation Successful. You can close this tab and return to the application."
     except ValueError:
@@ -96,40 +98,95 @@ def start_auth_listener(event: threading.Event):
     app.run(host=APP_URL.removeprefix("http://"), port=SERVER_PORT)
 
 
+class TokenManager:
+    def __init__(self, path=TOKEN_FILE):
+        """
+        Keeps the access token in memory and refreshes it shortly before it expires,
+        so getting a token costs no requests. Safe to use from several threads.
+
+        Args:
+            path (str, optional): JSON file the token is stored in. Defaults to TOKEN_FILE.
+        """
+        self.path = path
+        self.token = None
+        self.lock = threading.Lock()
+
+    def set(self, token):
+        """
+        Stores a token response from the token endpoint.
+
+        Args:
+            token (dict): Token response, with "expires_in" in seconds
+        """
+        with self.lock:
+            if self.token:
+                # Refresh responses may leave out the refresh token
+                token = {**self.token, **token}
+            token["expires_at"] = time.time() + token.get("expires_in", 3600)
+            self.token = token
+            self.save()
+
+    def save(self):
+        # Write to a temporary file first, so a crash never leaves a half written token
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(self.token, f)
+        os.replace(self.path + ".tmp", self.path)
+
+    def load(self):
+        with open(self.path, "r") as f:
+            self.token = json.load(f)
+        # Tokens saved before expiry was tracked are refreshed once
+        self.token.setdefault("expires_at", 0)
+
+    def refresh(self):
+        r = requests.post(
+            TOKEN_URL,
+            data={
+                "grant_type": "refresh_token",
+                "refresh_token": self.token["refresh_token"],
+                "client_id": client_id,
+                "client_secret": client_secret,
+            },
+        )
+        if r.status_code != 200:
+            raise Exception(f"Status code: {r.status_code} {r.text}")
+        token = {**self.token, **r.json()}
+        token["expires_at"] = time.time() + token.get("expires_in", 3600)
+        self.token = token
+        self.save()
+
+    def get(self):
+        """
+        Returns:
+            access_token (str): Access token, valid for at least REFRESH_MARGIN seconds
+        """
+        with self.lock:
+            if self.token is None:
+                self.load()
+            if time.time() >= self.token["expires_at"] - REFRESH_MARGIN:
+                self.refresh()
+            return self.token["access_token"]
+
+    def invalidate(self):
+        """Makes the next get() refresh the token, e.g. after a 401 response."""
+        with self.lock:
+            if self.token:
+                self.token["expires_at"] = 0
+
+
+token_manager = TokenManager()
+
+
 def get_access_token():
     """
-    Gets access token from JSON file.
-    If access token is invalid or expired, refreshes access token.
+    Gets the access token, refreshing it if it is about to expire.
 
     Args:
         None
     Returns:
         access_token (str): Access token
     """
-    token = {}
-    with open(os.path.join("spotify", "token.json"), "r+") as f:
-        token = json.load(f)
-        r = requests.get(
-            f"{BASE_API_URL}/v1/me",
-            headers={"Authorization": f"Bearer {token['access_token']}"},
-        )
-        if r.status_code != 200:
-            r = requests.post(
-                "https://accounts.spotify.com/api/token",
-                data={
-                    "grant_type": "refresh_token",
-                    "refresh_token": token["refresh_token"],
-                    "client_id": client_id,
-                    "client_secret": client_secret,
-                },
-            )
-            if r.status_code != 200:
-                raise Exception(f"Status code: {r.status_code} {r.text}")
-            token.update(r.json())
-            f.seek(0)
-            f.truncate()
-            json.dump(token, f)
-    return token["access_token"]
+    return token_manager.get()
 
 
 if __name__ == "__main__":
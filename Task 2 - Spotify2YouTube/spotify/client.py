@@ -0,0 +1,181 @@
+import random
+import re
+import statistics
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RATE = 8  # requests per second on average
+BURST = 16  # requests that can be made at once after being idle
+MAX_RETRIES = 5
+BACKOFF = 0.5  # seconds, doubled on every retry
+POOL_SIZE = 16  # keep-alive connections
+TIMEOUT = (5, 30)  # connect, read
+# Methods safe to replay after a 5xx or read timeout, when the request may
+# already have been applied. POSTs are only retried if they never got through.
+IDEMPOTENT_METHODS = {"GET", "PUT", "DELETE"}
+
+
+class SpotifyError(Exception):
+    def __init__(self, status_code, text):
+        super().__init__(f"Status code: {status_code} {text}")
+        self.status_code = status_code
+
+
+class TokenBucket:
+    def __init__(self, rate=RATE, capacity=BURST):
+        """
+        Token bucket rate limiter, shared by every thread making requests.
+
+        Args:
+            rate (float, optional): Tokens added per second. Defaults to RATE.
+            capacity (int, optional): Maximum tokens. Defaults to BURST.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a request may be made."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Stops all requests for a while, e.g. for a 429 Retry-After."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+
+class SpotifyClient:
+    def __init__(self, token_manager, limiter=None, max_retries=MAX_RETRIES):
+        """
+        Spotify Web API client over a persistent keep-alive session.
+        Requests are rate limited, 429s wait for Retry-After, and failed
+        requests are retried with jittered exponential backoff. Writes that
+        may have been applied (5xx, read timeout) are only retried for
+        idempotent methods, so a POST is never sent twice.
+
+        Args:
+            token_manager (spotify.auth.TokenManager): Gets a fresh token after a 401
+            limiter (TokenBucket, optional): Rate limiter. Defaults to a new TokenBucket.
+            max_retries (int, optional): Retries per request. Defaults to MAX_RETRIES.
+        """
+        self.token_manager = token_manager
+        self.limiter = limiter or TokenBucket()
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.metrics = {}  # endpoint -> {"latencies": [...], "retries": n, "errors": n}
+        self.metrics_lock = threading.Lock()
+
+    @staticmethod
+    def endpoint(method, url):
+        """GET /v1/playlists/{id}/tracks, without the query and with ids collapsed."""
+        path = re.sub(r"^https?://[^/]+", "", url).split("?")[0]
+        path = re.sub(r"/users/[^/]+", "/users/{id}", path)
+        path = re.sub(r"/[0-9A-Za-z]{22}(?=/|$)", "/{id}", path)
+        return f"{method} {path}"
+
+    def record(self, endpoint, latency=None, retry=False, error=False):
+        with self.metrics_lock:
+            m = self.metrics.setdefault(
+                endpoint, {"latencies": [], "retries": 0, "errors": 0}
+            )
+            if latency is not None:
+                m["latencies"].append(latency)
+            m["retries"] += retry
+            m["errors"] += error
+
+    def request(self, url, access_token=None, params=None, method="GET", data=None):
+        """
+        Makes an API request.
+
+        Args:
+            url (str): URL to make request to
+            access_token (str, optional): Access token. Defaults to the token manager's.
+            params (dict, optional): Query parameters. Defaults to None.
+            method (str, optional): HTTP method. Defaults to "GET".
+            data (str, optional): Request body. Defaults to None.
+        Returns:
+            json (dict): JSON response
+        """
+        endpoint = self.endpoint(method, url)
+        token = access_token or self.token_manager.get()
+        refreshed = False
+        idempotent = method in IDEMPOTENT_METHODS
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            start = time.perf_counter()
+            try:
+                r = self.session.request(
+                    method,
+                    url,
+                    headers={"Authorization": f"Bearer {token}"},
+                    params=params,
+                    data=data,
+                    timeout=TIMEOUT,
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                sent = isinstance(e, requests.ReadTimeout)
+                if attempt == self.max_retries or (sent and not idempotent):
+                    self.record(endpoint, error=True)
+                    raise
+                self.record(endpoint, retry=True)
+                time.sleep(random.uniform(0, BACKOFF * 2**attempt))
+                continue
+            self.record(endpoint, time.perf_counter() - start)
+
+            if r.status_code in [200, 201]:
+                return r.json()
+            if r.status_code == 401 and not refreshed and attempt < self.max_retries:
+                self.token_manager.invalidate()
+                token = self.token_manager.get()
+                refreshed = True
+                continue
+            if attempt < self.max_retries:
+                if r.status_code == 429:
+                    self.record(endpoint, retry=True)
+                    self.limiter.pause(
+                        float(r.headers.get("Retry-After", 1))
+                        + random.uniform(0, BACKOFF)
+                    )
+                    continue
+                if r.status_code >= 500 and idempotent:
+                    self.record(endpoint, retry=True)
+                    time.sleep(random.uniform(0, BACKOFF * 2**attempt))
+                    continue
+            self.record(endpoint, error=True)
+            raise SpotifyError(r.status_code, r.text)
+
+    def print_metrics(self):
+        """Prints the request count, latency and retries per endpoint."""
+        with self.metrics_lock:
+            metrics = dict(self.metrics)
+        if not metrics:
+            return
+        print(
+            f"\n{'Endpoint':<40}{'Calls':>7}{'p50 ms':>9}{'max ms':>9}{'Retries':>9}{'Errors':>8}"
+        )
+        for endpoint, m in sorted(metrics.items()):
+            latencies = [i * 1000 for i in m["latencies"]] or [0]
+            print(
+                f"{endpoint:<40}{len(m['latencies']):>7}{statistics.median(latencies):>9.0f}"
+                f"{max(latencies):>9.0f}{m['retries']:>9}{m['errors']:>8}"
+            )
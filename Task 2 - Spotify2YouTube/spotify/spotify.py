@@ -4,19 +4,23 @@ import os
 import threading
 import webbrowser
 
-import requests
 from spotify.auth import (
     APP_URL,
     BASE_API_URL,
     SERVER_PORT,
     get_access_token,
     start_auth_listener,
+    token_manager,
 )
+from spotify.client import SpotifyClient
+
+client = SpotifyClient(token_manager)
 
 
 def spotify_api_request(url, access_token, params=None, method="GET", data=None):
     """
-    Make an API request to Spotify.
+    Make an API request to Spotify through the shared client,
+    see spotify/client.py for rate limiting and retries.
 
     Args:
         url (str): URL to make request to
@@ -25,21 +29,7 @@ def spotify_api_request(url, access_token, params=None, method="GET", data=None)
     Returns:
         json (dict): JSON response
     """
-    methods = {
-        "GET": requests.get,
-        "POST": requests.post,
-        "PUT": requests.put,
-        "DELETE": requests.delete,
-    }
-    r = methods[method](
-        url,
-        headers={"Authorization": f"Bearer {access_token}"},
-        params=params,
-        data=data,
-    )
-    if r.status_code not in [200, 201]:
-        raise Exception(f"Status code: {r.status_code} {r.text}")
-    return r.json()
+    return client.request(url, access_token, params, method, data)
 
 
 def get_user_details(access_token):
@@ -191,46 +181,122 @@ def create_playlist(access_token, user_id, name, public=True):
     return playlist["id"]
 
 
+def get_playlist_uris(access_token, playlist_id):
+    """
+    Get the URIs of every track in a playlist from Spotify.
+
+    Args:
+        access_token (str): Access token
+        playlist_id (str): Playlist ID
+    Returns:
+        uris (set): Track URIs
+        length (int): Number of items in the playlist, counting duplicates and unavailable tracks
+    """
+    uris = set()
+    length = 0
+    r = spotify_api_request(
+        BASE_API_URL + f"/v1/playlists/{playlist_id}/tracks",
+        access_token,
+        params={"limit": 100, "fields": "next,items(track(uri))"},
+    )
+    while True:
+        uris.update(item["track"]["uri"] for item in r["items"] if item["track"])
+        length += len(r["items"])
+        if not r["next"]:
+            return uris, length
+        # next keeps the limit and fields
+        r = spotify_api_request(r["next"], access_token)
+
+
 def add_to_playlist(access_token, playlist_id, uris):
     """
-    Add tracks to a playlist on Spotify.
+    Add tracks to a playlist on Spotify, skipping the ones already in it.
+    Tracks are added in order, 100 per request.
 
     Args:
         access_token (str): Access token
         playlist_id (str): Playlist ID
         uris (list): List of track URIs
     Returns:
-        None
+        snapshot_id (str): Playlist version after the last addition, None if nothing was added
     """
-    # check if song already exists in playlist
-    playlist_items = get_playlist_items(access_token, playlist_id)
-    for item in playlist_items:
-        if item["uri"] in uris:
-            uris.remove(item["uri"])
-    if not uris:
+    existing, position = get_playlist_uris(access_token, playlist_id)
+    new = []
+    for uri in uris:
+        if uri not in existing:
+            existing.add(uri)
+            new.append(uri)
+    if not new:
         print("No new songs to add")
-        return
+        return None
 
-    spotify_api_request(
-        BASE_API_URL + f"/v1/playlists/{playlist_id}/tracks",
-        access_token,
-        method="POST",
-        data=json.dumps(
-            {
-                "uris": uris,
-            }
-        ),
-    )
+    snapshot_id = None
+    for i in range(0, len(new), 100):
+        # Each chunk goes right after the previous one, so the order holds
+        # even if the playlist changes in between
+        r = spotify_api_request(
+            BASE_API_URL + f"/v1/playlists/{playlist_id}/tracks",
+            access_token,
+            method="POST",
+            data=json.dumps({"uris": new[i : i + 100], "position": position + i}),
+        )
+        snapshot_id = r["snapshot_id"]
+    print(f"Added {len(new)} songs")
+    return snapshot_id
 
 
 # endregion
 
 
+LIKED_TIMESTAMPS_FILE = os.path.join("spotify", "liked_timestamps.json")
+
+
+def iter_new_liked_songs(access_token):
+    """
+    Stream the songs the user liked on Spotify since the last sync, newest first.
+    Liked songs are listed newest first, so paging stops at the first song
+    older than the sync cursor and the cost depends on the new likes only.
+    The cursor (per user, in liked_timestamps.json) moves to the newest
+    song once the generator is exhausted. For new users it starts 7 days ago.
+
+    Args:
+        access_token (str): Access token
+    Yields:
+        song (tuple): (name, artist)
+    """
+    user_id = get_user_details(access_token)["id"]
+    cursors = {}
+    if os.path.exists(LIKED_TIMESTAMPS_FILE):
+        with open(LIKED_TIMESTAMPS_FILE, "r") as f:
+            cursors = json.load(f)
+    week_ago = datetime.datetime.now(tz=datetime.timezone.utc) - datetime.timedelta(
+        days=7
+    )
+    last_checked = cursors.get(user_id, week_ago.strftime("%Y-%m-%dT%H:%M:%SZ"))
+
+    newest = last_checked
+    url = BASE_API_URL + "/v1/me/tracks"
+    params = {"limit": 50}
+    while url:
+        r = spotify_api_request(url, access_token, params=params)
+        for item in r["items"]:
+            if item["added_at"] <= last_checked:
+                url = None
+                break
+            newest = max(newest, item["added_at"])
+            yield item["track"]["name"], item["track"]["artists"][0]["name"]
+        else:
+            url, params = r["next"], None  # next keeps the limit
+
+    cursors[user_id] = newest
+    with open(LIKED_TIMESTAMPS_FILE + ".tmp", "w") as f:
+        json.dump(cursors, f)
+    os.replace(LIKED_TIMESTAMPS_FILE + ".tmp", LIKED_TIMESTAMPS_FILE)
+
+
 def get_new_liked_songs(access_token):
     """
-    Get the user's new liked songs from Spotify.
-    Last checked is stored in liked_times.json
-    For new users, last checked is 7 days ago
+    Get the user's new liked songs from Spotify, see iter_new_liked_songs.
 
     Args:
         access_token (str): Access token
@@ -238,39 +304,7 @@ def get_new_liked_songs(access_token):
         songs (list): List of songs [(name, artist)]
     """
     print("\nGetting new liked songs...")
-    print("This may take a while...")
-    now = datetime.datetime.now(tz=datetime.timezone.utc)
-    if os.path.exists(os.path.join("spotify", "liked_timestamps.json")):
-        with open(os.path.join("spotify", "liked_timestamps.json"), "r") as f:
-            last_checked = json.load(f)[get_user_details(access_token)["id"]]
-    else:
-        with open(os.path.join("spotify", "liked_timestamps.json"), "w") as f:
-            json.dump({}, f)
-        last_checked = (now - datetime.timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%SZ")
-
-    r = spotify_api_request(
-        BASE_API_URL + "/v1/me/tracks",
-        access_token,
-    )
-    songs = []
-    for item in r["items"]:
-        if item["added_at"] > last_checked:
-            songs.append((item["track"]["name"], item["track"]["artists"][0]["name"]))
-    if r["next"]:
-        while r["next"]:
-            r = spotify_api_request(r["next"], access_token)
-            for item in r["items"]:
-                if item["added_at"] > last_checked:
-                    songs.append(
-                        (item["track"]["name"], item["track"]["artists"][0]["name"])
-                    )
-    with open(os.path.join("spotify", "liked_timestamps.json"), "r+") as f:
-        d = json.load(f)
-        d[get_user_details(access_token)["id"]] = now.strftime("%Y-%m-%dT%H:%M:%SZ")
-        f.seek(0)
-        f.truncate()
-        json.dump(d, f)
-    return songs[:10]
+    return list(iter_new_liked_songs(access_token))
 
 
 def get_song_uri(access_token, name, artist):
@@ -0,0 +1,120 @@
+import datetime
+import json
+import os
+import re
+
+JOBS_DIR = "jobs"
+
+
+class Job:
+    def __init__(self, path, data):
+        """
+        A transfer saved as a list of items and the steps done for them
+        (resolve, insert, like, ...). Every finished step is written to disk
+        straight away, so a transfer cut short by the quota or the network
+        resumes where it stopped and never repeats a request that succeeded.
+
+        Use Job.open() rather than creating jobs directly.
+        """
+        self.path = path
+        self.data = data
+
+    @classmethod
+    def open(cls, key, build):
+        """
+        Resumes the unfinished job with this key, or starts a new one.
+
+        Args:
+            key (str): Identifies the transfer, e.g. "top_tracks"
+            build (callable): build() -> list of items, only called for a new job
+        Returns:
+            job (Job): The job
+        """
+        os.makedirs(JOBS_DIR, exist_ok=True)
+        path = os.path.join(JOBS_DIR, re.sub(r"[^\w-]", "_", key) + ".json")
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                job = cls(path, json.load(f))
+            print(
+                f"Resuming unfinished job from {job.data['created_at']} "
+                + f"({len(job.pending())} of {len(job.items)} items left)"
+            )
+            return job
+        job = cls(
+            path,
+            {
+                "key": key,
+                "created_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
+                "items": build(),
+                "steps": {},
+            },
+        )
+        job.save()
+        return job
+
+    @property
+    def items(self):
+        return self.data["items"]
+
+    def save(self):
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(self.path + ".tmp", self.path)
+
+    def is_done(self, step):
+        return step in self.data["steps"]
+
+    def step(self, step, fn):
+        """
+        Runs a step unless it is already done.
+
+        Args:
+            step (str): Step name, e.g. "resolve:3"
+            fn (callable): fn() -> result, must be JSON serialisable
+        Returns:
+            result: The result of fn, from this run or a previous one
+        """
+        if step not in self.data["steps"]:
+            self.data["steps"][step] = fn()
+            self.save()
+        return self.data["steps"][step]
+
+    def attempt(self, step, fn):
+        """
+        Runs a step unless it is already done, recording it only if it succeeds,
+        so a failed step is tried again when the job is resumed.
+
+        Args:
+            step (str): Step name, e.g. "insert:3"
+            fn (callable): fn() -> True if the step succeeded
+        Returns:
+            bool: Whether the step is done
+        """
+        if step not in self.data["steps"]:
+            if not fn():
+                return False
+            self.data["steps"][step] = True
+            self.save()
+        return True
+
+    def pending(self):
+        """
+        Returns:
+            list: (index, item) of the items not marked done
+        """
+        return [
+            (i, item)
+            for i, item in enumerate(self.items)
+            if not self.is_done(f"done:{i}")
+        ]
+
+    def mark_done(self, i):
+        """Marks an item as finished, after its last step or when it is skipped."""
+        self.step(f"done:{i}", lambda: True)
+
+    def finish(self):
+        """Deletes the job if every item is done."""
+        if not self.pending():
+            os.remove(self.path)
+            return True
+        return False
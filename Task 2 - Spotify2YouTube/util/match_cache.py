@@ -0,0 +1,153 @@
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+MATCH_CACHE_FILE = "match_cache.db"
+# Bumped when normalize() changes, older keys are dropped
+KEY_VERSION = 2
+# Seconds before a song that wasn't found is searched for again
+NEGATIVE_TTL = 7 * 24 * 60 * 60
+# Words of a bracketed part that doesn't change which recording it is
+NOISE_WORDS = {
+    "official", "music", "video", "audio", "lyric", "lyrics", "visualizer",
+    "visualiser", "hd", "hq", "4k", "mv", "explicit", "remaster", "remastered",
+}  # fmt: skip
+
+
+def is_noise(part):
+    """
+    Whether a bracketed part of a title can be dropped, e.g. "official video",
+    "lyrics", "feat. X" or "2011 remaster", but not "live" or "radio edit".
+    """
+    words = re.sub(r"[^a-z0-9]+", " ", part).split()
+    if words and words[0] in ["feat", "ft", "featuring"]:
+        return True
+    return all(word in NOISE_WORDS or word.isdigit() for word in words)
+
+
+def normalize(title, artist):
+    """
+    Normalizes a song so the same song matches across platforms and uploads.
+    Drops accents, case, punctuation, featured artists and noise like
+    "[Official Video]", but keeps the version, e.g.
+    "Señorita (feat. X) [Official Video]" -> "senorita" and
+    "Señorita - Live" -> "senorita live".
+
+    Args:
+        title (str): Song title
+        artist (str): Artist name
+    Returns:
+        key (str): "title|artist"
+    """
+
+    def clean(s):
+        s = unicodedata.normalize("NFKD", s or "").encode("ascii", "ignore").decode()
+        s = s.lower()
+        stripped = re.sub(
+            r"[\(\[](.*?)[\)\]]",
+            lambda m: " " if is_noise(m.group(1)) else f" {m.group(1)} ",
+            s,
+        )
+        stripped = re.sub(r"\s(feat|ft|featuring)\.?\s[^-]*", " ", stripped)
+        stripped = re.sub(r"\s-\s[^-]*remaster[^-]*$", " ", stripped)
+        stripped = re.sub(r"[^a-z0-9]+", " ", stripped).strip()
+        # Keep titles that are nothing but brackets, e.g. "(Intro)"
+        return stripped or re.sub(r"[^a-z0-9]+", " ", s).strip()
+
+    return f"{clean(title)}|{clean(artist)}"
+
+
+class MatchCache:
+    def __init__(self, path=MATCH_CACHE_FILE):
+        """
+        Persistent cache of song matches, from a normalized (title, artist)
+        to a YouTube video ID or Spotify URI. Songs that weren't found are
+        cached too, for NEGATIVE_TTL.
+
+        Args:
+            path (str): SQLite file
+        """
+        self.path = path
+        self.ready = False
+        self.stats = {}  # platform -> {"hits": n, "misses": n}
+        self.lock = threading.Lock()
+
+    def _connect(self):
+        # One connection per call, lookups come from several threads
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self.ready:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS matches (platform TEXT NOT NULL, song TEXT NOT NULL, "
+                + "match TEXT, checked_at REAL NOT NULL, PRIMARY KEY (platform, song))"
+            )
+            if conn.execute("PRAGMA user_version").fetchone()[0] < KEY_VERSION:
+                # Keys from an older normalize() may have merged different versions
+                conn.execute("DELETE FROM matches")
+                conn.execute(f"PRAGMA user_version = {KEY_VERSION}")
+                conn.commit()
+            self.ready = True
+        return conn
+
+    def count(self, platform, hit):
+        with self.lock:
+            s = self.stats.setdefault(platform, {"hits": 0, "misses": 0})
+            s["hits" if hit else "misses"] += 1
+
+    def get(self, platform, title, artist):
+        """
+        Returns:
+            tuple: (found, match), found is False if the song has to be searched
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT match, checked_at FROM matches WHERE platform = ? AND song = ?",
+                (platform, normalize(title, artist)),
+            ).fetchone()
+        if row is None:
+            return False, None
+        if row[0] is None and time.time() - row[1] > NEGATIVE_TTL:
+            return False, None
+        return True, row[0]
+
+    def put(self, platform, title, artist, match):
+        with self._connect() as conn:
+            conn.execute(
+                "REPLACE INTO matches (platform, song, match, checked_at) VALUES (?, ?, ?, ?)",
+                (platform, normalize(title, artist), match, time.time()),
+            )
+
+    def lookup(self, platform, title, artist, search):
+        """
+        Gets the match of a song, searching for it only if it isn't cached.
+
+        Args:
+            platform (str): "youtube" or "spotify"
+            title (str): Song title
+            artist (str): Artist name
+            search (callable): search() -> match, or None if the song wasn't found
+        Returns:
+            match (str): Video ID or URI, None if the song wasn't found
+        """
+        found, match = self.get(platform, title, artist)
+        self.count(platform, found)
+        if found:
+            return match
+        # Errors propagate without caching anything, only real misses are cached
+        match = search()
+        self.put(platform, title, artist, match)
+        return match
+
+    def print_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+        for platform, s in sorted(stats.items()):
+            total = s["hits"] + s["misses"]
+            print(
+                f"{platform.title()} match cache: {s['hits']}/{total} hits "
+                + f"({s['hits'] / total:.0%}), {s['misses']} searches"
+            )
+
+
+match_cache = MatchCache()
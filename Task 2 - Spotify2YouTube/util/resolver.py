@@ -0,0 +1,36 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+MAX_WORKERS = 8
+
+
+def resolve_concurrently(items, resolve, max_workers=MAX_WORKERS, label="Resolved"):
+    """
+    Resolves items in parallel, keeping their order.
+    Requests still go through the shared rate limiter, so this only fills
+    the time otherwise spent waiting on round trips.
+
+    Args:
+        items (list): Items to resolve, e.g. playlist items
+        resolve (callable): resolve(item) -> result
+        max_workers (int): Maximum resolutions at once
+        label (str): Progress message prefix
+    Returns:
+        results (list): Result for each item in order, None where resolving failed
+    """
+    results = [None] * len(items)
+    if not items:
+        return results
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(resolve, item): i for i, item in enumerate(items)}
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                print(f"\nError resolving {items[i]}: {e}")
+            rate = done / (time.perf_counter() - start)
+            print(f"\r{label} {done}/{len(items)} ({rate:.1f}/s)", end="", flush=True)
+    print()
+    return results
@@ -0,0 +1,139 @@
+import datetime
+import json
+import os
+import threading
+
+LEDGER_FILE = os.path.join("youtube", "quota_ledger.json")
+DAILY_QUOTA = 10000
+
+# Units per request, see the table in the README
+COSTS = {
+    "youtube.search.list": 100,
+    "youtube.subscriptions.insert": 50,
+    "youtube.videos.rate": 50,
+    "youtube.playlists.insert": 50,
+    "youtube.playlistItems.insert": 50,
+    "youtube.playlists.list": 1,
+    "youtube.playlistItems.list": 1,
+    "youtube.subscriptions.list": 1,
+}
+
+
+def quota_day():
+    """
+    The current quota day. The quota resets at midnight Pacific Time.
+
+    Returns:
+        str: Date in Pacific Time, e.g. "2024-01-31"
+    """
+    try:
+        from zoneinfo import ZoneInfo
+
+        tz = ZoneInfo("America/Los_Angeles")
+    except Exception:
+        # No time zone database (e.g. Windows without tzdata), assume PST
+        tz = datetime.timezone(datetime.timedelta(hours=-8))
+    return datetime.datetime.now(tz).date().isoformat()
+
+
+def cost(*methods):
+    """
+    Args:
+        methods (str): API methods, e.g. "youtube.search.list"
+    Returns:
+        int: Total units
+    """
+    return sum(COSTS.get(i, 1) for i in methods)
+
+
+class QuotaLedger:
+    def __init__(self, path=LEDGER_FILE, daily_quota=DAILY_QUOTA):
+        """
+        Persistent record of the YouTube quota units spent today, per API method.
+
+        Args:
+            path (str): JSON file
+            daily_quota (int): Units available per day
+        """
+        self.path = path
+        self.daily_quota = daily_quota
+        self.lock = threading.Lock()
+        self.ledger = {"day": quota_day(), "spent": {}}
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                self.ledger = json.load(f)
+
+    def _rollover(self):
+        day = quota_day()
+        if self.ledger["day"] != day:
+            self.ledger = {"day": day, "spent": {}}
+
+    def _save(self):
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(self.ledger, f, indent=2)
+        os.replace(self.path + ".tmp", self.path)
+
+    def record(self, method, units=None):
+        """
+        Records a request.
+
+        Args:
+            method (str): API method, e.g. "youtube.search.list"
+            units (int, optional): Units spent. Defaults to the method's cost.
+        """
+        with self.lock:
+            self._rollover()
+            spent = self.ledger["spent"]
+            spent[method] = spent.get(method, 0) + (
+                cost(method) if units is None else units
+            )
+            self._save()
+
+    def exhaust(self):
+        """Marks today's quota as used up, after a quotaExceeded error."""
+        remaining = self.remaining()
+        if remaining > 0:
+            self.record("quotaExceeded", remaining)
+
+    def spent(self):
+        with self.lock:
+            self._rollover()
+            return sum(self.ledger["spent"].values())
+
+    def remaining(self):
+        return max(self.daily_quota - self.spent(), 0)
+
+
+ledger = QuotaLedger()
+
+
+def plan_batch(items, item_cost, fixed_cost=0, label="items"):
+    """
+    Picks the largest batch of items, in order, that fits in the remaining quota.
+
+    Args:
+        items (list): Items to process
+        item_cost (callable): item_cost(item) -> units, 0 for work that is cached
+        fixed_cost (int): Units spent once, e.g. creating the playlist
+        label (str): What the items are, for the messages
+    Returns:
+        items (list): The items that fit
+    """
+    remaining = ledger.remaining()
+    total = fixed_cost
+    count = 0
+    for item in items:
+        units = item_cost(item)
+        if total + units > remaining:
+            break
+        total += units
+        count += 1
+    if not count and items:
+        total = 0
+    print(f"Estimated YouTube quota: {total} units, {remaining} left today")
+    if count < len(items):
+        print(
+            f"Only {count} of {len(items)} {label} fit in today's quota, "
+            + "the rest can be done after the reset at midnight PT."
+        )
+    return items[:count]
@@ -7,6 +7,7 @@ from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build as api_build
 from googleapiclient.errors import HttpError
+from youtube.quota import ledger
 
 # If modifying these scopes, delete the file token.json.
 SCOPES = [
@@ -43,6 +44,14 @@ def get_creds():
     return creds
 
 
+class QuotaExceededError(Exception):
+    pass
+
+
+class IncompleteListError(Exception):
+    pass
+
+
 http = AuthorizedHttp(get_creds(), http=httplib2.Http(cache=".cache"))
 
 
@@ -57,9 +66,16 @@ def youtube_api_request(request, params):
         dict: Response from the YouTube API
     """
     retry_count = 0
+    req = request(**params)
     try:
-        return request(**params).execute(http=http)
+        response = req.execute(http=http)
+        ledger.record(req.methodId)
+        return response
     except HttpError as e:
+        if e.error_details[0]["reason"] == "quotaExceeded":
+            ledger.exhaust()
+        else:
+            ledger.record(req.methodId)
         if e.error_details[0]["reason"] == "SERVICE_UNAVAILABLE":
             if retry_count < 3:
                 retry_count += 1
@@ -76,13 +92,36 @@ def youtube_api_request(request, params):
             print(
                 "You can also try creating a new project on the Google Cloud Console and using its credentials."
             )
-            exit()
+            raise QuotaExceededError(e.reason)
         elif e.error_details[0]["reason"] == "subscriptionDuplicate":
             print(e.reason)
         else:
             print(e)
 
 
+def iter_subscriptions(youtube):
+    """
+    Streams the channels the user is subscribed to.
+
+    Args:
+        youtube (googleapiclient.discovery.Resource): YouTube API resource
+    Yields:
+        dict: Channel {"name", "id"}
+    """
+    for subscription in iter_pages(
+        youtube.subscriptions().list,
+        {
+            "part": "snippet",
+            "mine": True,
+            "fields": "nextPageToken,items/snippet(title,resourceId/channelId)",
+        },
+    ):
+        yield {
+            "name": subscription["snippet"]["title"],
+            "id": subscription["snippet"]["resourceId"]["channelId"],
+        }
+
+
 def add_subscription(youtube, channel_name):
     """
     Adds a subscription to the user's YouTube account.
@@ -130,6 +169,54 @@ def add_subscription(youtube, channel_name):
 # region Playlist functions
 
 
+def iter_pages(request, params):
+    """
+    Streams the items of a list request, one page of up to 50 at a time.
+
+    Args:
+        request (googleapiclient.http.HttpRequest): YouTube API list request
+        params (dict): Parameters for the request, fields should include nextPageToken
+    Yields:
+        dict: Items of the response
+    Raises:
+        IncompleteListError: If a page failed, rather than end with part of the list
+    """
+    params = {**params, "maxResults": 50}
+    while True:
+        response = youtube_api_request(request, params)
+        if not isinstance(response, dict):
+            # The error is printed
+            raise IncompleteListError("A page of the list couldn't be loaded")
+        yield from response.get("items", [])
+        if not response.get("nextPageToken"):
+            return
+        params["pageToken"] = response["nextPageToken"]
+
+
+def iter_playlists(youtube):
+    """
+    Streams the user's playlists.
+
+    Args:
+        youtube (googleapiclient.discovery.Resource): YouTube API resource
+    Yields:
+        dict: Playlist {"name", "id", "public"}
+    """
+    for playlist in iter_pages(
+        youtube.playlists().list,
+        {
+            "part": "snippet,status",
+            "mine": True,
+            "fields": "nextPageToken,items(id,snippet/title,status/privacyStatus)",
+        },
+    ):
+        yield {
+            "name": playlist["snippet"]["title"],
+            "id": playlist["id"],
+            "public": playlist["status"]["privacyStatus"] == "public",
+        }
+
+
 def get_playlists(youtube):
     """
     Gets the user's playlists.
@@ -139,24 +226,63 @@ def get_playlists(youtube):
     Returns:
         list: User's playlists
     """
-    playlists_response = youtube_api_request(
-        youtube.playlists().list,
+    return list(iter_playlists(youtube))
+
+
+def get_title_artist(s):
+    """
+    Splits a video title like "Artist - Title (Official Video)" into its song and artist.
+
+    Args:
+        s (str): Video title
+    Returns:
+        tuple: (title, artist), artist is "" if it couldn't be found
+    """
+    title, artist = s, ""
+    try:
+        if " - " in s:
+            title = s.split(" - ")[1]
+            if " (" in title:
+                title = title.split(" (")[0]
+            elif " [" in title:
+                title = title.split(" [")[0]
+            artist = s.split(" - ")[0]
+        elif "|" in s:
+            title = s.split(" | ")[0]
+            if " (" in title:
+                title = title.split(" (")[0]
+            elif " [" in title:
+                title = title.split(" [")[0]
+            artist = s.split(" | ")[1]
+    except IndexError:
+        pass
+    return title, artist
+
+
+def iter_playlist_items(youtube, playlist_id):
+    """
+    Streams the videos in a playlist.
+
+    Args:
+        youtube (googleapiclient.discovery.Resource): YouTube API resource
+        playlist_id (str): Playlist ID
+    Yields:
+        dict: Video {"title", "artist", "video_id"}
+    """
+    for video in iter_pages(
+        youtube.playlistItems().list,
         {
-            "part": "snippet,status",
-            "mine": True,
-            "maxResults": 50,
+            "part": "snippet",
+            "playlistId": playlist_id,
+            "fields": "nextPageToken,items/snippet(title,resourceId/videoId)",
         },
-    )
-    playlists = []
-    for playlist in playlists_response["items"]:
-        playlists.append(
-            {
-                "name": playlist["snippet"]["title"],
-                "id": playlist["id"],
-                "public": playlist["status"]["privacyStatus"] == "public",
-            }
-        )
-    return playlists
+    ):
+        title, artist = get_title_artist(video["snippet"]["title"])
+        yield {
+            "title": title,
+            "artist": artist,
+            "video_id": video["snippet"]["resourceId"]["videoId"],
+        }
 
 
 def get_playlist_items(youtube, playlist_id):
@@ -169,59 +295,7 @@ def get_playlist_items(youtube, playlist_id):
     Returns:
         list: Playlist items
     """
-    playlist_items_response = youtube_api_request(
-        youtube.playlistItems().list,
-        {"part": "snippet", "playlistId": playlist_id},
-    )
-    videos = []
-
-    def get_title_artist(s):
-        title, artist = s, ""
-        try:
-            if " - " in s:
-                title = s.split(" - ")[1]
-                if " (" in title:
-                    title = title.split(" (")[0]
-                elif " [" in title:
-                    title = title.split(" [")[0]
-                artist = s.split(" - ")[0]
-            elif "|" in s:
-                title = s.split(" | ")[0]
-                if " (" in title:
-                    title = title.split(" (")[0]
-                elif " [" in title:
-                    title = title.split(" [")[0]
-                artist = s.split(" | ")[1]
-        except IndexError:
-            pass
-        return title, artist
-
-    for video in playlist_items_response["items"]:
-        title, artist = get_title_artist(video["snippet"]["title"])
-        videos.append(
-            {
-                "title": title,
-                "artist": artist,
-            }
-        )
-    while playlist_items_response.get("nextPageToken"):
-        playlist_items_response = youtube_api_request(
-            youtube.playlistItems().list,
-            {
-                "part": "snippet",
-                "playlistId": playlist_id,
-                "pageToken": playlist_items_response["nextPageToken"],
-            },
-        )
-        for video in playlist_items_response["items"]:
-            title, artist = get_title_artist(video["snippet"]["title"])
-            videos.append(
-                {
-                    "title": title,
-                    "artist": artist,
-                }
-            )
-    return videos
+    return list(iter_playlist_items(youtube, playlist_id))
 
 
 def create_playlist(youtube, name, public=True):
@@ -267,30 +341,68 @@ def create_playlist(youtube, name, public=True):
     return playlist_response["id"]
 
 
+class PlaylistIndex:
+    def __init__(self, youtube, playlist_id):
+        """
+        The video IDs in a playlist, loaded once with every page,
+        then kept up to date locally as videos are added.
+        Raises IncompleteListError if a page fails, so no partial index is kept.
+
+        Args:
+            youtube (googleapiclient.discovery.Resource): YouTube API resource
+            playlist_id (str): Playlist ID
+        """
+        self.video_ids = {
+            video["snippet"]["resourceId"]["videoId"]
+            for video in iter_pages(
+                youtube.playlistItems().list,
+                {
+                    "part": "snippet",
+                    "playlistId": playlist_id,
+                    "fields": "nextPageToken,items/snippet/resourceId/videoId",
+                },
+            )
+        }
+
+    def __contains__(self, video_id):
+        return video_id in self.video_ids
+
+    def add(self, video_id):
+        self.video_ids.add(video_id)
+
+
+playlist_indexes = {}  # playlist ID -> PlaylistIndex
+
+
+def get_playlist_index(youtube, playlist_id):
+    """
+    Gets the membership index of a playlist, loading it on first use.
+
+    Args:
+        youtube (googleapiclient.discovery.Resource): YouTube API resource
+        playlist_id (str): Playlist ID
+    Returns:
+        PlaylistIndex: Index of the playlist
+    """
+    if playlist_id not in playlist_indexes:
+        playlist_indexes[playlist_id] = PlaylistIndex(youtube, playlist_id)
+    return playlist_indexes[playlist_id]
+
+
 def add_video_to_playlist(youtube, playlist_id, video_id):
     """
-    Adds a video to a playlist.
+    Adds a video to a playlist, unless it is already in it.
 
     Args:
         youtube (googleapiclient.discovery.Resource): YouTube API resource
         playlist_id (str): Playlist ID
         video_id (str): Video ID
     Returns:
-        response: Response from the YouTube API
+        bool: True if the video is in the playlist, False if adding it failed
     """
-
-    # check if video is already in playlist
-    playlist_items_response = youtube_api_request(
-        youtube.playlistItems().list,
-        {
-            "part": "snippet",
-            "playlistId": playlist_id,
-            "maxResults": 50,
-        },
-    )
-    for video in playlist_items_response["items"]:
-        if video["snippet"]["resourceId"]["videoId"] == video_id:
-            return
+    index = get_playlist_index(youtube, playlist_id)
+    if video_id in index:
+        return True
 
     r = youtube_api_request(
         youtube.playlistItems().insert,
@@ -307,7 +419,10 @@ def add_video_to_playlist(youtube, playlist_id, video_id):
             },
         },
     )
-    return r
+    if not isinstance(r, dict):
+        return False  # the error is printed
+    index.add(video_id)
+    return True
 
 
 # endregion
@@ -322,7 +437,7 @@ def get_video_id(youtube, name, artist):
         name (str): Name of the song
         artist (str): Name of the artist
     Returns:
-        str: Video ID
+        str: Video ID, None if no video was found
     """
     search_response = youtube_api_request(
         youtube.search().list,
@@ -334,7 +449,8 @@ def get_video_id(youtube, name, artist):
             "videoCategoryId": "10",
         },
     )
-    return search_response["items"][0]["id"]["videoId"]
+    items = search_response["items"]  # TypeError if the request failed
+    return items[0]["id"]["videoId"] if items else None
 
 
 def like_video(youtube, video_id):
@@ -345,12 +461,14 @@ def like_video(youtube, video_id):
         youtube (googleapiclient.discovery.Resource): YouTube API resource
         video_id (str): Video ID
     Returns:
-        None
+        bool: True if the video was liked, False if the request failed
     """
-    youtube_api_request(
+    r = youtube_api_request(
         youtube.videos().rate,
         {
             "id": video_id,
             "rating": "like",
         },
     )
+    # The rating has no content, which the client parses as {}
+    return isinstance(r, dict)
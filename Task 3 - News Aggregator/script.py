@@ -1,11 +1,11 @@
-import base64
-import json
 import os
 import pickle
+import queue
 import random
 import re
 import sys
 import threading
+import time
 import tkinter as tk
 import tkinter.ttk as ttk
 import webbrowser
@@ -14,13 +14,24 @@ from io import BytesIO
 from tkinter import filedialog as fd
 from tkinter import messagebox as msgb
 
-import requests
-from PIL import Image, ImageChops, ImageDraw, ImageTk
+from PIL import Image, ImageTk
 
 sys.path.append(os.curdir)
 import util.db_handler as db
+import util.pfp_store as pfp_store
+from util.auth_service import auth_service
+from util.downloader import download_image
+from util.feed_cache import feed_cache
+from util.feed_planner import FeedPlanner
+from util.feed_registry import FeedRegistry
+from util.image_loader import image_loader
+from util.memory_budget import MemoryBudget, estimate_footprint
+from util.ranking import rank_articles
+from util.reader_cache import reader_prefetcher
 from util.theme import Theme
-from util.xml_parser import get_articles_from_rss
+from util.thumbnail import get_thumbnail
+from util.workers import enable_process_pool, run_cpu
+from util.xml_parser import resolve_image
 
 ASSETS = os.path.join(os.curdir, "assets")
 
@@ -28,9 +39,12 @@ REMEMBER_ME_FILE = os.path.join(os.curdir, "settings", "remember_me.bin")
 
 THEME_FILE = os.path.join(os.curdir, "settings", "theme.bin")
 
-f = open(os.path.join(ASSETS, "rss_feeds.json"), "r")
-RSS_FEEDS: dict = json.load(f)
-f.close()
+READER_MODE_FILE = os.path.join(os.curdir, "settings", "reader_mode.bin")
+
+feed_registry = FeedRegistry()
+RSS_FEEDS: dict = feed_registry.topics()
+feed_cache.set_intervals(feed_registry.intervals())
+feed_planner = FeedPlanner(RSS_FEEDS)
 
 if not os.name == "nt":
     print("I don't like your Operating System. Install Windows.")
@@ -51,7 +65,7 @@ class ScrollableFrame(ttk.Frame):
         )
         self.scrollable_frame = tk.Frame(self.canvas)
 
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
 
         self.bind("<Configure>", self._on_frame_configure)
         self.canvas.bind("<Configure>", self._on_canvas_configure)
@@ -76,6 +90,14 @@ class ScrollableFrame(ttk.Frame):
     def _on_mousewheel(self, event):
         self.canvas.yview_scroll(-1 * int(event.delta / 120), "units")
 
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._on_view_change()
+
+    def _on_view_change(self):
+        """Called whenever the visible region of the canvas changes."""
+        pass
+
 
 class NewsAggregator(tk.Toplevel):
     def __init__(self):
@@ -102,6 +124,9 @@ class NewsAggregator(tk.Toplevel):
         self.feed_frames = {i: None for i in self.tabs}
         self.loading_labels = {i: None for i in self.tabs}
         self.loaded_once = {i: False for i in self.tabs}
+        self.tab_feeds = {i: None for i in self.tabs}
+        self.evicted = set()
+        self.memory_budget = MemoryBudget()
         self.logo_label.destroy()
         self.geometry(
             f"{self.screen_width}x{self.screen_height}+{self.x_coord}+{self.y_coord}"
@@ -121,6 +146,9 @@ class NewsAggregator(tk.Toplevel):
 
         def load_queue():
             while True:
+                if not self.queue:
+                    # don't spin, it starves the Tk thread of the GIL
+                    time.sleep(0.05)
                 for topic in self.queue:
                     print(f"Loading {topic} Feed")
                     try:
@@ -132,7 +160,14 @@ class NewsAggregator(tk.Toplevel):
                     self.loading_labels[topic].destroy()
 
         def load_feed(topic, force=False):
+            self.enforce_memory_budget(topic)
+            if force:
+                Feed.invalidate(self.fav_topics if topic == "favorites" else [topic])
+            elif topic in self.evicted:
+                self.evicted.discard(topic)
+                self.place_feed_frame(topic, self.tab_feeds[topic])
             if not self.loaded_once[topic] or force:
+                self.memory_budget.pin(topic)
                 self.loading_labels[topic] = tk.Label(
                     self.tabs[topic],
                     text="Loading...",
@@ -193,7 +228,7 @@ class NewsAggregator(tk.Toplevel):
                 command=lambda_func(load_feed, i, True),
             ).place(relx=0.01, rely=0.03, anchor="w")
 
-        self.my_pfp = NewsAggregator.get_pfp(self.name, (40, 40))
+        self.my_pfp = NewsAggregator.get_pfp(self.name, 40)
         self.acc_button = tk.Button(
             self,
             image=self.my_pfp,
@@ -245,6 +280,7 @@ class NewsAggregator(tk.Toplevel):
                     self.acc_frame,
                     self.acc_button,
                     self.theme_button,
+                    self.reader_button,
                 ]:
                     self.acc_frame.destroy()
 
@@ -298,6 +334,24 @@ class NewsAggregator(tk.Toplevel):
             )
             self.theme_button.grid(row=4, column=1, sticky="e", pady=2)
 
+            reader_var = tk.BooleanVar(value=reader_prefetcher.enabled)
+
+            def toggle_reader_mode():
+                reader_prefetcher.enabled = reader_var.get()
+                with open(READER_MODE_FILE, "wb") as f:
+                    pickle.dump(reader_prefetcher.enabled, f)
+
+            tk.Label(self.acc_frame, text="Reader Mode", font=("rockwell", 14)).grid(
+                row=5, column=0, sticky="e", pady=2, padx=6
+            )
+            self.reader_button = ttk.Checkbutton(
+                self.acc_frame,
+                style="Switch.TCheckbutton",
+                variable=reader_var,
+                command=toggle_reader_mode,
+            )
+            self.reader_button.grid(row=5, column=1, sticky="e", pady=2)
+
     def change_password(self):
         self.acc_frame.destroy()
         self.change_frame = ttk.Frame(self, style="Card.TFrame", padding=4)
@@ -364,18 +418,30 @@ class NewsAggregator(tk.Toplevel):
                 msg = "Password does not match"
                 prompt(msg)
             else:
-                if db.change_password(self.name, pwd) == "Success":
-                    msg = "Confirming and Logging you out..."
-                    prompt(msg)
-                    try:
-                        os.remove(REMEMBER_ME_FILE)
-                    except FileNotFoundError:
-                        pass
-                    self.after(2000, self.log_out)
-                else:
-                    self.pwdentry.delete(0, tk.END)
-                    msg = "ERROR"
-                    prompt(msg)
+                self.change_button.config(state="disabled")
+                auth_service.submit(
+                    self,
+                    db.change_password,
+                    self.name,
+                    pwd,
+                    callback=chng_pass_done,
+                    errback=lambda e: chng_pass_done(str(e)),
+                )
+
+        def chng_pass_done(result):
+            if result == "Success":
+                msg = "Confirming and Logging you out..."
+                prompt(msg)
+                try:
+                    os.remove(REMEMBER_ME_FILE)
+                except FileNotFoundError:
+                    pass
+                self.after(2000, self.log_out)
+            else:
+                self.change_button.config(state="normal")
+                self.pwdentry.delete(0, tk.END)
+                msg = "ERROR"
+                prompt(msg)
 
         def prompt(msg):
             try:
@@ -465,7 +531,7 @@ class NewsAggregator(tk.Toplevel):
 
     def change_pfp(self):
         self.acc_frame.destroy()
-        self.pfp_path = os.path.join(ASSETS, ".cache", self.name + ".png")
+        self.pfp_path = None  # current picture
         self.change_frame = ttk.Frame(self, style="Card.TFrame", padding=4)
         self.change_frame.place(
             relx=0.99, rely=0.1, relheight=0.3, relwidth=0.25, anchor="ne"
@@ -481,9 +547,12 @@ class NewsAggregator(tk.Toplevel):
         self.select_pfp()
 
     def select_pfp(self):
-        self.pfp_image = ImageTk.PhotoImage(
-            NewsAggregator.circle_PIL_Image(Image.open(self.pfp_path), (100, 100))
-        )
+        if self.pfp_path is None:
+            self.pfp_image = NewsAggregator.get_pfp(self.name, 100)
+        else:
+            self.pfp_image = ImageTk.PhotoImage(
+                pfp_store.circle_image(Image.open(self.pfp_path), (100, 100))
+            )
         tk.Label(self.change_frame, image=self.pfp_image).place(
             relx=0.5, rely=0.3, anchor="center"
         )
@@ -531,7 +600,7 @@ class NewsAggregator(tk.Toplevel):
         def confirm_change():
             db.change_pfp(self.name, NewsAggregator.pfp_send(self.pfp_path))
             self.change_frame.destroy()
-            self.my_pfp = NewsAggregator.get_pfp(self.name, force=True)
+            self.my_pfp = NewsAggregator.get_pfp(self.name, 40, force=True)
             self.acc_button.configure(image=self.my_pfp)
 
         self.confirm_button = ttk.Button(
@@ -541,7 +610,7 @@ class NewsAggregator(tk.Toplevel):
             command=confirm_change,
         )
 
-        if self.pfp_path == os.path.join(ASSETS, ".cache", self.name + ".png"):
+        if self.pfp_path is None:
             self.confirm_button.destroy()
         else:
             self.confirm_button.place(relx=0.5, rely=0.9, anchor="center")
@@ -598,62 +667,22 @@ class NewsAggregator(tk.Toplevel):
                 (im.size[1] + min(im.size)) // 2,
             )
         ).resize((256, 256), Image.Resampling.LANCZOS)
-        im.save(os.path.join(ASSETS, "temp.png"), optimize=True)
-        with open(os.path.join(ASSETS, "temp.png"), "rb") as f:
-            a = base64.b64encode(f.read()).decode("latin1")
-        os.remove(os.path.join(ASSETS, "temp.png"))
-        return a
+        buffer = BytesIO()
+        im.save(buffer, "PNG", optimize=True)
+        return buffer.getvalue()
 
     @staticmethod
-    def pfp_make(img):
-        try:
-            b = base64.b64decode(img.encode("latin1"))
-            c = Image.open(BytesIO(b))
-            return c
-        except Exception as e:
-            print(f"Couldn't Access Profile Picture\n{e}")
-            return Image.open(os.path.join(ASSETS, "default_pfp.png"))
-
-    @staticmethod
-    def get_pfp(name, resize=(32, 32), force=False):
-        if not os.path.isfile(os.path.join(ASSETS, ".cache", name + ".png")) or force:
-            NewsAggregator.circle_PIL_Image(
-                NewsAggregator.pfp_make(db.fetch_pfp(name))
-            ).save(os.path.join(ASSETS, ".cache", name + ".png"))
-        return ImageTk.PhotoImage(
-            Image.open(os.path.join(ASSETS, ".cache", name + ".png")).resize(
-                resize, Image.Resampling.LANCZOS
-            )
-        )
-
-    @staticmethod
-    def circle_PIL_Image(pil_img: Image.Image, resize=(256, 256)):
-        im = pil_img.convert("RGBA")
-        im = im.crop(
-            (
-                (im.size[0] - min(im.size)) // 2,
-                (im.size[1] - min(im.size)) // 2,
-                (im.size[0] + min(im.size)) // 2,
-                (im.size[1] + min(im.size)) // 2,
-            )
-        ).resize(resize, Image.Resampling.LANCZOS)
-        bigsize = (im.size[0] * 10, im.size[1] * 10)
-
-        mask = Image.new("L", bigsize, 0)
-        ImageDraw.Draw(mask).ellipse((0, 0) + bigsize, fill=255)
-        mask = mask.resize(im.size, Image.Resampling.LANCZOS)
-        mask = ImageChops.darker(
-            mask,
-            im.split()[-1],
-        )
-        im.putalpha(mask)
-
-        a = im.resize(bigsize)
-        ImageDraw.Draw(a).ellipse((0, 0) + (bigsize), outline=(0, 0, 0), width=15)
-        a = a.resize(im.size, Image.Resampling.LANCZOS)
-        im.paste(a)
-
-        return im
+    def get_pfp(name, size=40, force=False):
+        im = None if force else pfp_store.load(name, size)
+        if im is None:
+            try:
+                run_cpu(pfp_store.render_encoded, name, db.fetch_pfp(name))
+            except Exception as e:
+                print(f"Couldn't Access Profile Picture\n{e}")
+                with open(os.path.join(ASSETS, "default_pfp.png"), "rb") as f:
+                    run_cpu(pfp_store.render_encoded, name, f.read())
+            im = pfp_store.load(name, size)
+        return ImageTk.PhotoImage(im)
 
     # endregion
 
@@ -743,8 +772,11 @@ class NewsAggregator(tk.Toplevel):
             command=update_topics,
         ).grid(row=3, column=2, sticky="nsew", pady=5)
 
-    def show_feed(self, topic="favorites"):
-        self.articles = Feed(topic, self.name).articles
+    def place_feed_frame(self, topic, feed):
+        """
+        Replaces the feed frame of a tab with one showing the feed's articles.
+        Used when the feed is loaded and to rebuild evicted tabs from their cached articles.
+        """
         self.feed_frames[topic].destroy()
         self.feed_frames[topic] = ttk.Frame(
             self.tabs[topic], style="Card.TFrame", padding=4
@@ -758,14 +790,63 @@ class NewsAggregator(tk.Toplevel):
             relx=0.01, rely=0.07, relheight=0.9, relwidth=0.98
         )
 
-        if self.articles:
+        if feed.articles:
             self.feed_frames[topic] = FeedFrame(
-                self.tabs[topic], self.articles, self.name
+                self.tabs[topic],
+                feed.articles,
+                self.name,
+                load_more=feed.next_page if topic == "saved" else None,
             )
             self.feed_frames[topic].place(
                 relx=0.01, rely=0.07, relheight=0.9, relwidth=0.98
             )
 
+        self.memory_budget.update(topic, self.feed_footprint(topic))
+
+    def feed_footprint(self, topic):
+        frame = self.feed_frames[topic]
+        if not isinstance(frame, FeedFrame):
+            return 0
+        return estimate_footprint(
+            len(frame.article_frames),
+            sum(i.tk_image is not None for i in frame.articles),
+        )
+
+    def enforce_memory_budget(self, current):
+        """
+        Evicts the least recently viewed tabs down to their articles
+        once the feeds' images and widgets exceed the memory budget.
+        """
+        for i in self.feed_frames:
+            # A loading tab records its own footprint once its frame is built
+            if isinstance(
+                self.feed_frames[i], FeedFrame
+            ) and not self.memory_budget.is_pinned(i):
+                self.memory_budget.update(i, self.feed_footprint(i))
+        self.memory_budget.touch(current)
+        for i in self.memory_budget.to_evict(protect=[current]):
+            print(f"Evicting {i} Feed")
+            self.feed_frames[i].destroy()
+            for j in self.tab_feeds[i].articles:
+                j.tk_image = None
+            self.feed_frames[i] = ttk.Frame(
+                self.tabs[i], style="Card.TFrame", padding=4
+            )
+            self.feed_frames[i].place(
+                relx=0.01, rely=0.07, relheight=0.9, relwidth=0.98
+            )
+            self.memory_budget.remove(i)
+            self.evicted.add(i)
+
+    def show_feed(self, topic="favorites"):
+        try:
+            feed = Feed(topic, self.name, list(self.fav_topics))
+            self.tab_feeds[topic] = feed
+            self.evicted.discard(topic)
+            self.place_feed_frame(topic, feed)
+        finally:
+            self.memory_budget.unpin(topic)
+
         self.loading_labels[topic].destroy()
 
         if topic == "favorites":
@@ -843,62 +924,98 @@ class NewsAggregator(tk.Toplevel):
 
 
 class Article:
+    placeholder_image = None
+
     def __init__(self, article_dict: dict):
         self.link = article_dict["link"]
         self.title = article_dict["title"]
         self.image = article_dict["image"]
+        self.tk_image = None
+
+    def load_image(self):
+        """
+        Gets the article thumbnail, downloading it if it isn't cached.
+        Called from a worker thread.
+
+        Returns:
+            PIL.Image.Image: The resized image, or None if it couldn't be loaded
+        """
         try:
-            self.tk_image = ImageTk.PhotoImage(
-                Image.open(
-                    BytesIO(
-                        requests.get(
-                            self.image,
-                            headers={
-                                "Referer": "https://www.google.com/",
-                                "User-Agent": "Mozilla/5.0",
-                            },
-                        ).content
-                    )
-                ).resize((250, 175), Image.Resampling.LANCZOS)
-            )
+            return get_thumbnail(self.image, lambda: download_image(self.image))
         except:
-            self.tk_image = ImageTk.PhotoImage(
+            self.image = None
+            return None
+
+    @staticmethod
+    def get_placeholder():
+        if Article.placeholder_image is None:
+            Article.placeholder_image = ImageTk.PhotoImage(
                 Image.open(os.path.join(ASSETS, "logo.png")).resize(
                     (250, 175), Image.Resampling.LANCZOS
                 )
             )
-            self.image = None
+        return Article.placeholder_image
 
 
 class Feed:
-    def __init__(self, topic, username):
+    PAGE_SIZE = 15
+    SAVED_PAGE_SIZE = 20
+
+    def __init__(self, topic, username, fav_topics=()):
+        # fav_topics comes from NewsAggregator, so loading a tab doesn't query the DB
         self.articles = []
-        if topic == "favorites":
-            self.topics = db.get_fav_topics(username)
-            if not self.topics:
-                self.topics = RSS_FEEDS.keys()
-        elif topic == "saved":
-            articles = db.get_saved_articles(username)
-            for i in articles:
-                self.articles.append(Article(i))
+        self.username = username
+        self.cursor = None
+        if topic == "saved":
+            self.cursor = ()
+            self.articles = self.next_page()
             self.topics = []
+            return
+        if topic == "favorites":
+            self.topics = list(fav_topics) or list(RSS_FEEDS.keys())
         else:
             self.topics = [topic]
 
-        self.articles_per_topic = (15 // len(self.topics)) if len(self.topics) else 15
-        for i in self.topics:
-            self.add_articles(i, self.articles_per_topic)
-        if len(self.articles) > 15:
-            self.articles = random.sample(self.articles, 15)
+        items = self.get_items(self.topics)
+        for i in rank_articles(items, Feed.PAGE_SIZE, fav_topics):
+            self.articles.append(Article(resolve_image(i)))
+
+    def next_page(self):
+        """
+        Gets the next page of saved articles.
+
+        Returns:
+            list: Articles, empty when there are no more pages
+        """
+        if self.cursor is None:
+            return []
+        articles = db.get_saved_articles(
+            self.username, Feed.SAVED_PAGE_SIZE, self.cursor
+        )
+        if len(articles) < Feed.SAVED_PAGE_SIZE:
+            self.cursor = None
         else:
-            random.shuffle(self.articles)
+            self.cursor = articles[-1]["cursor"]
+        return [Article(i) for i in articles]
+
+    def get_items(self, topics):
+        """
+        Fetches just enough feeds of the topics to fill a page, see util/feed_planner.py.
+
+        Args:
+            topics (iterable): Topics
+
+        Returns:
+            list: Item dicts tagged with their topic, a few more than PAGE_SIZE to rank
+        """
+        return feed_planner.fill(topics, Feed.PAGE_SIZE)
 
-    def add_articles(self, topic, articles_per_topic):
-        for i in RSS_FEEDS[topic]:
-            articles_per_feed = articles_per_topic // len(RSS_FEEDS[topic]) + 1
-            feed = get_articles_from_rss(i, articles_per_feed)
-            for j in feed:
-                self.articles.append(Article(j))
+    @staticmethod
+    def invalidate(topics):
+        """Drops the cached feeds of the topics, so the next load refetches them."""
+        for i in topics:
+            for j in RSS_FEEDS.get(i, []):
+                feed_cache.invalidate(j)
 
 
 class ArticleFrame(ttk.Frame):
@@ -912,7 +1029,7 @@ class ArticleFrame(ttk.Frame):
         self.title = (self.title[:69] + "...") if len(self.title) > 69 else self.title
         self.title = self.title.replace("&#8217;", "'")
 
-        self.image = self.article.tk_image
+        self.image = self.article.tk_image or Article.get_placeholder()
         self.label = tk.Label(
             self,
             text=self.title,
@@ -927,6 +1044,9 @@ class ArticleFrame(ttk.Frame):
         self.label.place(relx=0.5, rely=0.5, relheight=1, relwidth=1, anchor="center")
 
         def open_link():
+            if reader_prefetcher.enabled:
+                self.open_reader()
+                return
             self.label.configure(cursor="watch")
             webbrowser.open(self.article.link)
             self.label.configure(cursor="hand2")
@@ -934,6 +1054,38 @@ class ArticleFrame(ttk.Frame):
         self.label.bind("<Button-1>", lambda a: open_link())
         self.save_unsave()
 
+    def open_reader(self):
+        """
+        Shows the article in the reader view, from the offline cache if it was prefetched.
+        Falls back to the browser if the text couldn't be extracted.
+        """
+        self.label.configure(cursor="watch")
+        results = queue.Queue()
+        threading.Thread(
+            target=lambda: results.put(reader_prefetcher.load(self.article.link)),
+            daemon=True,
+        ).start()
+
+        def check():
+            if results.empty():
+                self.after(20, check)
+                return
+            article = results.get()
+            self.label.configure(cursor="hand2")
+            if article and article["paragraphs"]:
+                ReaderView(self, article, self.article)
+            else:
+                webbrowser.open(self.article.link)
+
+        check()
+
+    def set_image(self, pil_image):
+        if pil_image is None:
+            return
+        self.article.tk_image = ImageTk.PhotoImage(pil_image)
+        self.image = self.article.tk_image
+        self.label.configure(image=self.image)
+
     def remove_html_tags(self, text):
         """Remove html tags from a string"""
 
@@ -996,16 +1148,38 @@ class ArticleFrame(ttk.Frame):
 
 
 class FeedFrame(ScrollableFrame):
-    def __init__(self, master, articles: list[Article], username):
+    ROW_HEIGHT = 255
+    PRELOAD_ROWS = 1
+    scrollheight = 0  # view changes can fire before __init__ finishes
+
+    def __init__(self, master, articles: list[Article], username, load_more=None):
         scrollheight = len(articles) // 4 * 255 + (255 if len(articles) % 4 else 0)
         super().__init__(master, height=scrollheight)
+        self.scrollheight = scrollheight
+        self.username = username
+        self.load_more = load_more
+        self.loading_more = False
 
         self.articles = articles
-        self.article_frames = [
-            ArticleFrame(self.scrollable_frame, i, username) for i in self.articles
-        ]
+        self.article_frames = []
+        self.ui_queue = queue.Queue()
+        self.place_cards(0)
+
+        self.poll_id = self.after(50, self._poll_queue)
+        self.after_idle(self._on_view_change)
+
+    def add_articles(self, articles: list[Article]):
+        start = len(self.articles)
+        self.articles.extend(articles)
+        self.place_cards(start)
+
+    def place_cards(self, start):
+        self.article_frames.extend(
+            ArticleFrame(self.scrollable_frame, i, self.username)
+            for i in self.articles[start:]
+        )
 
-        for i, j in enumerate(self.article_frames):
+        for i, j in enumerate(self.article_frames[start:], start):
             j.place(
                 height=250,
                 relwidth=0.2475,
@@ -1014,6 +1188,119 @@ class FeedFrame(ScrollableFrame):
                 anchor="nw",
             )
 
+        if start:
+            n = len(self.article_frames)
+            self.scrollheight = n // 4 * 255 + (255 if n % 4 else 0)
+            self.canvas.itemconfig("self.scrollable_frame", height=self.scrollheight)
+            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+
+    def _on_view_change(self):
+        """
+        Requests images for the cards in or near the viewport
+        and cancels pending requests for the rest.
+        Fetches the next page when scrolled near the bottom.
+        """
+        if not self.scrollheight:
+            return
+        first, last = self.canvas.yview()
+        top = first * self.scrollheight - self.PRELOAD_ROWS * self.ROW_HEIGHT
+        bottom = last * self.scrollheight + self.PRELOAD_ROWS * self.ROW_HEIGHT
+        in_view = []
+        for i, frame in enumerate(self.article_frames):
+            y = (i // 4) * self.ROW_HEIGHT
+            visible = y + self.ROW_HEIGHT >= top and y <= bottom
+            if visible:
+                in_view.append(frame.article.link)
+            if frame.article.tk_image is not None:
+                continue
+            if visible:
+                image_loader.request(
+                    frame,
+                    frame.article.load_image,
+                    lambda img, frame=frame: self.ui_queue.put(
+                        lambda: frame.set_image(img) if frame.winfo_exists() else None
+                    ),
+                )
+            else:
+                image_loader.cancel(frame)
+        reader_prefetcher.prefetch(in_view)
+
+        if (
+            self.load_more
+            and not self.loading_more
+            and self.canvas.winfo_height() > 1  # not mapped yet, the view is bogus
+            and bottom >= self.scrollheight
+        ):
+            self.loading_more = True
+            threading.Thread(target=self._load_more, daemon=True).start()
+
+    def _load_more(self):
+        articles = self.load_more()
+        self.ui_queue.put(lambda: self._more_loaded(articles))
+
+    def _more_loaded(self, articles):
+        if not articles:
+            self.load_more = None
+        else:
+            self.add_articles(articles)
+        self.loading_more = False
+        self._on_view_change()
+
+    def _poll_queue(self):
+        # Widgets and PhotoImages have to be created in the Tk thread
+        while not self.ui_queue.empty():
+            self.ui_queue.get()()
+        self.poll_id = self.after(50, self._poll_queue)
+
+    def destroy(self):
+        self.after_cancel(self.poll_id)
+        for i in self.article_frames:
+            image_loader.cancel(i)
+        super().destroy()
+
+
+class ReaderView(tk.Toplevel):
+    def __init__(self, master, article: dict, source: Article):
+        """
+        Shows the extracted text of an article.
+
+        Args:
+            master (tk.Widget): Parent widget
+            article (dict): {'title': '...', 'paragraphs': ['...', ...]}
+            source (Article): The article card, for its title and link
+        """
+        super().__init__(master)
+        self.title(article["title"] or source.title)
+        self.geometry(
+            f"{self.winfo_screenwidth() // 2}x{int(self.winfo_screenheight() * 0.8)}"
+        )
+
+        ttk.Button(
+            self,
+            text="Open in Browser",
+            style="12.TButton",
+            command=lambda: webbrowser.open(source.link),
+        ).pack(side="bottom", pady=6)
+
+        scrollbar = ttk.Scrollbar(self, orient="vertical")
+        scrollbar.pack(side="right", fill="y")
+        text = tk.Text(
+            self,
+            wrap="word",
+            font=("georgia", 13),
+            padx=24,
+            pady=16,
+            borderwidth=0,
+            yscrollcommand=scrollbar.set,
+        )
+        text.tag_configure("title", font=("rockwell", 20), spacing3=12)
+        text.tag_configure("body", spacing3=10)
+        text.insert("end", (article["title"] or source.title) + "\n", "title")
+        text.insert("end", "\n".join(article["paragraphs"]), "body")
+        text.configure(state="disabled")
+        text.pack(side="left", fill="both", expand=True)
+        scrollbar.configure(command=text.yview)
+
 
 class Login(tk.Frame):
     def __init__(self, master, complete, remember_login=False):
@@ -1023,7 +1310,6 @@ class Login(tk.Frame):
         self.complete = complete
 
         if remember_login:
-            flag = True
             log_win = tk.Toplevel(self)
             log_win.geometry(
                 f"{300}x{40}+{self.winfo_screenwidth()//2-150}+{self.winfo_screenheight()//2-20}"
@@ -1038,28 +1324,47 @@ class Login(tk.Frame):
                     uname, pwd = pickle.load(f)
                 except:
                     uname = pwd = ""
-            self.check_login = db.do_login(uname, pwd, remember_login=True)
-            if self.check_login[0] == "Success":
-                lbl.configure(text="Loading...")
-                self.loading_thread = threading.Thread(
-                    target=lambda: self.complete(uname), daemon=True
-                )
-                self.loading_thread.start()
-            else:
-                lbl.configure(text="Invalid Credentials! File Corrupted!", fg="red")
-                flag = False
-                try:
-                    os.remove(REMEMBER_ME_FILE)
-                except FileNotFoundError:
-                    pass
 
-            def thing():
+            def remembered(check_login):
+                self.check_login = check_login
+                flag = True
+                if self.check_login[0] == "Success":
+                    lbl.configure(text="Loading...")
+                    self.loading_thread = threading.Thread(
+                        target=lambda: self.complete(uname), daemon=True
+                    )
+                    self.loading_thread.start()
+                else:
+                    lbl.configure(text="Invalid Credentials! File Corrupted!", fg="red")
+                    flag = False
+                    try:
+                        os.remove(REMEMBER_ME_FILE)
+                    except FileNotFoundError:
+                        pass
+
+                def thing():
+                    log_win.destroy()
+                    master.deiconify()
+                    if flag:
+                        self.destroy()
+
+                self.after(1500, thing)
+
+            def remember_error(e):
                 log_win.destroy()
                 master.deiconify()
-                if flag:
-                    self.destroy()
-
-            self.after(1500, thing)
+                self.connection_error(e)
+
+            # The first database connection happens here, keep it off the Tk thread
+            auth_service.submit(
+                self,
+                db.do_login,
+                uname,
+                pwd,
+                remember_login=True,
+                callback=remembered,
+                errback=remember_error,
+            )
 
         tk.Label(
             self,
@@ -1174,33 +1479,43 @@ class Login(tk.Frame):
             pwd = ""
             self.prompt(msg)
         else:
-            try:
-                self.check_login = db.do_login(
-                    uname.strip(), pwd.strip(), remember_me=self.remember_me.get()
-                )
-            except Exception as e:
-                print(e)
-                self.destroy()
-                msgb.showerror(
-                    "Connection Error",
-                    "Unable to connect to the Server at the moment, please try again later!\nThings you can do:\n1. Check your network connection\n2. Restart your system\n3. If this issue persists, wait for sometime. The server might be down, We are working on it!",
-                    master=root,
-                )
-                quit()
-            if self.check_login[0] == "Success":
-                msg = "Logging in..."
-                self.pwdentry.config(state="disabled")
-                self.uentry.config(state="disabled")
-                self.login_button.config(state="disabled")
-                self.pwdentry.unbind("<Return>")
-                self.uentry.unbind("<Return>")
-                self.prompt(msg)
-                if isinstance(self.check_login[1], str):
-                    self.store_password(uname.strip(), self.check_login[1])
-                self.after(1500, lambda: self.complete(uname))
-            else:
-                msg = "Incorrect Username or Password"
-                self.prompt(msg)
+            self.login_button.config(state="disabled")
+            auth_service.submit(
+                self,
+                db.do_login,
+                uname.strip(),
+                pwd.strip(),
+                remember_me=self.remember_me.get(),
+                callback=lambda r: self.login_done(uname, r),
+                errback=self.connection_error,
+            )
+
+    def login_done(self, uname, check_login):
+        self.check_login = check_login
+        if self.check_login[0] == "Success":
+            msg = "Logging in..."
+            self.pwdentry.config(state="disabled")
+            self.uentry.config(state="disabled")
+            self.pwdentry.unbind("<Return>")
+            self.uentry.unbind("<Return>")
+            self.prompt(msg)
+            if isinstance(self.check_login[1], str):
+                self.store_password(uname.strip(), self.check_login[1])
+            self.after(1500, lambda: self.complete(uname))
+        else:
+            self.login_button.config(state="normal")
+            msg = "Incorrect Username or Password"
+            self.prompt(msg)
+
+    def connection_error(self, e):
+        print(e)
+        self.destroy()
+        msgb.showerror(
+            "Connection Error",
+            "Unable to connect to the Server at the moment, please try again later!\nThings you can do:\n1. Check your network connection\n2. Restart your system\n3. If this issue persists, wait for sometime. The server might be down, We are working on it!",
+            master=root,
+        )
+        quit()
 
     def store_password(self, uname, pwd):
         with open(
@@ -1352,7 +1667,7 @@ class Register(tk.Frame):
 
     def pfp_select(self):
         self.pfp_image = ImageTk.PhotoImage(
-            NewsAggregator.circle_PIL_Image(Image.open(self.pfp_path), (100, 100))
+            pfp_store.circle_image(Image.open(self.pfp_path), (100, 100))
         )
         tk.Label(self, image=self.pfp_image).place(relx=0.8, rely=0.26, anchor="center")
         self.remove_image = ImageTk.PhotoImage(
@@ -1449,29 +1764,39 @@ class Register(tk.Frame):
             msg = "Password does not match"
             self.prompt(msg)
         else:
-            try:
-                if db.register(
+            self.reg_button.config(state="disabled")
+            auth_service.submit(
+                self,
+                lambda path=self.pfp_path: db.register(
                     uname.strip(),
                     pwd.strip(),
-                    NewsAggregator.pfp_send(self.pfp_path),
-                ):
-                    msg = "Registering..."
-                    self.prompt(msg)
-                    self.after(1000, self.complete)
-                else:
-                    self.uentry.delete(0, tk.END)
-                    self.pwdentry.delete(0, tk.END)
-                    msg = "User Already Registered"
-                    self.prompt(msg)
-            except Exception as e:
-                print(e)
-                self.destroy()
-                msgb.showerror(
-                    "Try Again Later",
-                    "Unable to connect to the Server at the moment, please try again later!\nThings you can do:\n1. Check your network connection\n2. Restart your system\n3. If this issue persists, wait for sometime. The server might be down, We are working on it!",
-                    master=root,
-                )
-                quit()
+                    NewsAggregator.pfp_send(path),
+                ),
+                callback=self.reg_done,
+                errback=self.connection_error,
+            )
+
+    def reg_done(self, result):
+        self.reg_button.config(state="normal")
+        if result == "Success":
+            msg = "Registering..."
+            self.prompt(msg)
+            self.after(1000, self.complete)
+        else:
+            self.uentry.delete(0, tk.END)
+            self.pwdentry.delete(0, tk.END)
+            msg = "User Already Registered"
+            self.prompt(msg)
+
+    def connection_error(self, e):
+        print(e)
+        self.destroy()
+        msgb.showerror(
+            "Try Again Later",
+            "Unable to connect to the Server at the moment, please try again later!\nThings you can do:\n1. Check your network connection\n2. Restart your system\n3. If this issue persists, wait for sometime. The server might be down, We are working on it!",
+            master=root,
+        )
+        quit()
 
     def prompt(self, msg):
         try:
@@ -1507,6 +1832,15 @@ if __name__ == "__main__":
     if not os.path.exists(os.path.join(os.curdir, "pfp")):
         os.mkdir(os.path.join(os.curdir, "pfp"))
 
+    feed_cache.use_sqlite(os.path.join(os.curdir, "settings", "feed_cache.db"))
+
+    if "--process-pool" in sys.argv:
+        enable_process_pool()
+
+    if os.path.exists(READER_MODE_FILE):
+        with open(READER_MODE_FILE, "rb") as f:
+            reader_prefetcher.enabled = pickle.load(f)
+
     if not os.path.exists(THEME_FILE):
         with open(THEME_FILE, "wb") as f:
             pickle.dump("dark", f)
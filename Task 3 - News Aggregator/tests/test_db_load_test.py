@@ -0,0 +1,88 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from collections import defaultdict
+
+import mysql.connector as msc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# db_handler reads credentials.json from the working directory on import
+_cwd = os.getcwd()
+with tempfile.TemporaryDirectory() as tmp:
+    with open(os.path.join(tmp, "credentials.json"), "w") as f:
+        json.dump({"password": ""}, f)
+    os.chdir(tmp)
+    try:
+        import util.db_handler as db
+    finally:
+        os.chdir(_cwd)
+
+from util.db_load_test import report, returned, succeeded, timed
+
+
+class FailingCursor:
+    def execute(self, query, multi=False):
+        raise msc.ProgrammingError(msg="forced failure")
+
+    def close(self):
+        pass
+
+
+class FailingConnection:
+    def cursor(self):
+        return FailingCursor()
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class TimedTest(unittest.TestCase):
+    def setUp(self):
+        self.connection, self.strict = db.db.db, db.db.strict
+        db.db.db = FailingConnection()
+        db.db.strict = True
+
+    def tearDown(self):
+        db.db.db, db.db.strict = self.connection, self.strict
+
+    def test_forced_sql_failures_are_errors(self):
+        results = defaultdict(list)
+        timed(results, db.save_article, "u", "t", "l", "", ok=succeeded)
+        timed(results, db.get_saved_articles, "u", 20, ok=returned)
+        timed(results, db.login, "u", "p", ok=succeeded)
+        self.assertEqual(
+            dict(results),
+            {"save_article": [None], "get_saved_articles": [None], "login": [None]},
+        )
+
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            report(results, 1)
+        row = next(i for i in out.getvalue().splitlines() if i.startswith("login"))
+        self.assertEqual(row.split()[1:3], ["1", "1"])  # calls, errors
+
+    def test_failed_result_is_an_error(self):
+        results = defaultdict(list)
+        timed(results, lambda: "Incorrect password", ok=succeeded)
+        timed(results, lambda: "Success", ok=succeeded)
+        latencies = results["<lambda>"]
+        self.assertIsNone(latencies[0])
+        self.assertIsNotNone(latencies[1])
+
+    def test_non_strict_prints_instead(self):
+        db.db.strict = False
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertIsNone(db.db.execute("SELECT 1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
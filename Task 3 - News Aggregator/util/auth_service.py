@@ -0,0 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor
+
+POLL_INTERVAL = 20  # ms
+
+
+class AuthService:
+    def __init__(self, max_workers=2):
+        """
+        Runs bcrypt hashing and database work off the Tk thread.
+
+        Args:
+            max_workers (int, optional): Worker threads. Defaults to 2.
+        """
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="auth"
+        )
+
+    def submit(self, widget, fn, *args, callback, errback=None, **kwargs):
+        """
+        Runs fn(*args, **kwargs) in a worker and posts the result back to the Tk loop.
+
+        Args:
+            widget (tk.Misc): Widget whose event loop receives the result
+            fn (callable): Function to run, e.g. db_handler.do_login
+            callback (callable): Called in the Tk thread with the result
+            errback (callable, optional): Called in the Tk thread with the exception. Defaults to None (re-raise).
+
+        Returns:
+            concurrent.futures.Future: The pending call
+        """
+        future = self.executor.submit(fn, *args, **kwargs)
+
+        def poll():
+            if not future.done():
+                widget.after(POLL_INTERVAL, poll)
+            elif future.exception() is None:
+                callback(future.result())
+            elif errback:
+                errback(future.exception())
+            else:
+                raise future.exception()
+
+        widget.after(POLL_INTERVAL, poll)
+        return future
+
+
+auth_service = AuthService()
@@ -0,0 +1,62 @@
+"""
+Finds the bcrypt cost factor for a target login latency on this machine.
+
+Usage: python util/bcrypt_benchmark.py [target_ms]
+"""
+
+import statistics
+import sys
+import time
+
+import bcrypt
+
+TARGET_MS = 250
+RUNS = 3
+
+
+def time_checkpw(rounds, runs=RUNS):
+    """
+    Times bcrypt.checkpw, the hashing cost of a login, for a cost factor.
+
+    Args:
+        rounds (int): bcrypt cost factor
+        runs (int, optional): Number of timed runs. Defaults to RUNS.
+
+    Returns:
+        float: Median time in milliseconds
+    """
+    hashed = bcrypt.hashpw(b"benchmark", bcrypt.gensalt(rounds))
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        bcrypt.checkpw(b"benchmark", hashed)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def choose_rounds(target_ms=TARGET_MS):
+    """
+    Picks the highest cost factor whose login hashing time stays within the target.
+
+    Args:
+        target_ms (float, optional): Target hashing time. Defaults to TARGET_MS.
+
+    Returns:
+        int: Cost factor, at least 10
+    """
+    best = 10
+    for rounds in range(10, 17):
+        ms = time_checkpw(rounds)
+        print(f"rounds={rounds}: {ms:.1f} ms")
+        if ms > target_ms:
+            break
+        best = rounds
+    return best
+
+
+if __name__ == "__main__":
+    target = float(sys.argv[1]) if len(sys.argv) > 1 else TARGET_MS
+    rounds = choose_rounds(target)
+    print(f"\nHighest cost within {target:.0f} ms: {rounds}")
+    print(f'Add "bcrypt_rounds": {rounds} to credentials.json to use it.')
+    print("Existing passwords keep working, the cost is stored in each hash.")
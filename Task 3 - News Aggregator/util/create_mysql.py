@@ -38,12 +38,29 @@ cursor.execute(
 cursor.execute(
     """
     CREATE TABLE IF NOT EXISTS saved_articles (
+        id INT AUTO_INCREMENT PRIMARY KEY,
         user_id INT NOT NULL,
         title VARCHAR(255) NOT NULL,
         link VARCHAR(255) NOT NULL,
         image VARCHAR(255) NOT NULL,
-        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        saved_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+        INDEX saved_order (user_id, saved_at, id)
     )
     """
 )
+
+# Tables created before saved articles were paginated
+cursor.execute(
+    "SELECT COLUMN_NAME FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = 'NewsAggregator' AND TABLE_NAME = 'saved_articles'"
+)
+columns = [i[0] for i in cursor.fetchall()]
+if "id" not in columns:
+    cursor.execute(
+        "ALTER TABLE saved_articles ADD COLUMN id INT AUTO_INCREMENT PRIMARY KEY FIRST"
+    )
+if "saved_at" not in columns:
+    cursor.execute(
+        "ALTER TABLE saved_articles ADD COLUMN saved_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP, ADD INDEX saved_order (user_id, saved_at, id)"
+    )
 print("Created Database and Tables")
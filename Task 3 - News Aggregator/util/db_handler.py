@@ -1,13 +1,12 @@
-import base64
 import datetime
 import json
 import os
-
-import bcrypt
-import mysql.connector as msc
+import threading
 
 f = open("credentials.json", "r")
-PASSWORD = json.load(f)["password"]
+credentials = json.load(f)
+PASSWORD = credentials["password"]
+BCRYPT_ROUNDS = credentials.get("bcrypt_rounds", 12)  # see util/bcrypt_benchmark.py
 f.close()
 
 HOST = "localhost"
@@ -19,6 +18,16 @@ PFP_PATH = "pfp"
 
 class Database:
     def __init__(self):
+        # The connection is shared by the Tk thread, feed threads and auth workers
+        self.lock = threading.RLock()
+        # Connected on first use, so importing this module stays cheap
+        self.db = None
+        # Raise query errors instead of printing them, for util/db_load_test.py
+        self.strict = False
+
+    def connect(self):
+        import mysql.connector as msc
+
         self.db = msc.connect(
             host=HOST,
             username=USERNAME,
@@ -38,31 +47,32 @@ class Database:
         Returns:
             list: Response from the database
         """
-        while True:
-            try:
-                cursor = self.db.cursor()
-                response = []
-                if multi:
-                    for result in cursor.execute(query, multi=True):
-                        if result.with_rows:
-                            print(result.fetchall())
-                else:
-                    cursor.execute(query)
-                    response = cursor.fetchall()
-                cursor.close()
-                return response
-
-            except msc.OperationalError:
-                self.db = msc.connect(
-                    host=HOST,
-                    username=USERNAME,
-                    password=PASSWORD,
-                    database="NewsAggregator",
-                    autocommit=True,
-                )
-            except Exception as e:
-                print(f'{e} avoided, Query was "{query}"')
-                return None
+        import mysql.connector as msc
+
+        with self.lock:
+            if self.db is None:
+                self.connect()
+            while True:
+                try:
+                    cursor = self.db.cursor()
+                    response = []
+                    if multi:
+                        for result in cursor.execute(query, multi=True):
+                            if result.with_rows:
+                                print(result.fetchall())
+                    else:
+                        cursor.execute(query)
+                        response = cursor.fetchall()
+                    cursor.close()
+                    return response
+
+                except msc.OperationalError:
+                    self.connect()
+                except Exception as e:
+                    if self.strict:
+                        raise
+                    print(f'{e} avoided, Query was "{query}"')
+                    return None
 
     def data_change(self, query, multi=True):
         """
@@ -74,11 +84,14 @@ class Database:
         Returns:
             None
         """
-        try:
-            self.execute(query, multi=multi)
-            self.db.commit()
-        except:
-            self.db.rollback()
+        with self.lock:
+            try:
+                self.execute(query, multi=multi)
+                self.db.commit()
+            except:
+                self.db.rollback()
+                if self.strict:
+                    raise
 
 
 db = Database()
@@ -91,15 +104,17 @@ def register(username, password, pfp):
     Args:
         username (str): Username
         password (str): Password
-        pfp (str): Base64 encoded image
+        pfp (bytes): Encoded image
     Returns:
         str: Success or Error message
     """
+    import bcrypt
+
     password = password.encode("utf-8")
     count = db.execute(f"SELECT * FROM users WHERE username = '{username}'")
     if len(count):
         return "Username already exists"
-    password = str(bcrypt.hashpw(password, bcrypt.gensalt()))[2:-1]
+    password = str(bcrypt.hashpw(password, bcrypt.gensalt(BCRYPT_ROUNDS)))[2:-1]
     created_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     db.data_change(
         f'INSERT INTO users (username, password, created_at) VALUES ("{username}", "{password}", "{created_at}")'
@@ -147,6 +162,8 @@ def login(username, password):
     Returns:
         str: Success or Error message
     """
+    import bcrypt
+
     password = password.encode("utf-8")
     storedpw = db.execute(f"SELECT password FROM users WHERE username='{username}'")
     if len(storedpw) and bcrypt.checkpw(password, storedpw[0][0].encode("utf-8")):
@@ -182,6 +199,8 @@ def change_password(username, new_password):
     Returns:
         str: Success or Error message
     """
+    import bcrypt
+
     # old_password = old_password.encode("utf-8")
     new_password = new_password.encode("utf-8")
     # storedpw = db.execute(f"SELECT password FROM users WHERE username='{username}'")
@@ -190,7 +209,7 @@ def change_password(username, new_password):
     #     db.data_change(f'UPDATE users SET password="{p}" WHERE username="{username}"')
     #     return "Success"
     # return "Password is incorrect"
-    p = str(bcrypt.hashpw(new_password, bcrypt.gensalt()))[2:-1]
+    p = str(bcrypt.hashpw(new_password, bcrypt.gensalt(BCRYPT_ROUNDS)))[2:-1]
     db.data_change(f'UPDATE users SET password="{p}" WHERE username="{username}"')
     return "Success"
 
@@ -206,7 +225,7 @@ def fetch_pfp(name):
         name (str): Username
 
     Returns:
-        str: Base64 encoded image
+        bytes: Encoded image
     """
     pfp = load_img(name)
     if not pfp:
@@ -220,7 +239,7 @@ def change_pfp(username, new_pfp):
 
     Args:
         username (str): Username
-        new_pfp (str): Base64 encoded image
+        new_pfp (bytes): Encoded image
 
     Returns:
         str: Success or Error message
@@ -232,7 +251,7 @@ def change_pfp(username, new_pfp):
 def save_img(img, user):
     try:
         with open(os.path.join(PFP_PATH, f"{user}_pfp.png"), "wb") as f:
-            f.write(base64.b64decode(img.encode("latin1")))
+            f.write(img)
     except Exception as e:
         print("Error while saving image:", e)
 
@@ -241,16 +260,16 @@ def load_img(user):
     if os.path.isfile(os.path.join(PFP_PATH, f"{user}_pfp.png")):
         try:
             with open(os.path.join(PFP_PATH, f"{user}_pfp.png"), "rb") as f:
-                return base64.b64encode(f.read()).decode("latin1")
+                return f.read()
         except Exception as e:
             print("Error while loading image:", e)
     else:
         try:
             with open(os.path.join(PFP_PATH, f"default_pfp.png"), "rb") as f:
                 with open(os.path.join(PFP_PATH, f"{user}_pfp.png"), "wb") as f2:
-                    f2.write(f.read())
-                f.seek(0)
-                return base64.b64encode(f.read()).decode("latin1")
+                    data = f.read()
+                    f2.write(data)
+                return data
         except Exception as e:
             print("Error while loading image:", e)
 
@@ -314,20 +333,38 @@ def is_saved_article(username, link):
     return len(res) > 0
 
 
-def get_saved_articles(username):
+def get_saved_articles(username, limit=None, after=None):
     """
-    Gets the saved articles for the user
+    Gets the saved articles for the user, most recently saved first
 
     Args:
         username (str): Username
+        limit (int, optional): Maximum number of articles to return. Defaults to None (all).
+        after (tuple, optional): Cursor of the last article of the previous page. Defaults to None (first page).
 
     Returns:
-        list: List of saved articles
-    """
-    res = db.execute(
-        f'SELECT title, link, image FROM saved_articles WHERE user_id=(SELECT id FROM users WHERE username="{username}")'
+        list: List of saved articles, each with a 'cursor' for the next page
+    """
+    query = f'SELECT title, link, image, saved_at, id FROM saved_articles WHERE user_id=(SELECT id FROM users WHERE username="{username}")'
+    if after:
+        query += f' AND (saved_at < "{after[0]}" OR (saved_at = "{after[0]}" AND id < {after[1]}))'
+    query += " ORDER BY saved_at DESC, id DESC"
+    if limit:
+        query += f" LIMIT {int(limit)}"
+    res = db.execute(query)
+    return (
+        [
+            {
+                "title": i[0],
+                "link": i[1],
+                "image": i[2],
+                "cursor": (i[3].strftime("%Y-%m-%d %H:%M:%S"), i[4]),
+            }
+            for i in res
+        ]
+        if res
+        else []
     )
-    return [{"title": i[0], "link": i[1], "image": i[2]} for i in res] if res else []
 
 
 # endregion
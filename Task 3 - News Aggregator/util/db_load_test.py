@@ -0,0 +1,221 @@
+"""
+Load tests util/db_handler.py with simulated users against the local database.
+
+Usage: python util/db_load_test.py [--users N] [--processes P] [--duration S]
+                                   [--login-rate R] [--topic-rate R] [--save-rate R]
+Run it from the directory containing script.py, after util/create_mysql.py.
+Rates are operations per user per minute. The loadtest_ users it creates are deleted afterwards.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+from multiprocessing import Pool
+
+USER_PREFIX = "loadtest_"
+PASSWORD = "loadtest"
+TOPICS = [
+    "india",
+    "sports",
+    "business",
+    "entertainment",
+    "technology",
+    "world",
+    "health",
+]
+ARTICLES = 50  # links the simulated users save and unsave
+
+
+def username(i):
+    return f"{USER_PREFIX}{i}"
+
+
+def timed(results, fn, *args, ok=None):
+    """
+    Calls fn and records its latency, or None if it failed.
+    db_handler prints most errors instead of raising them, so the database
+    has to be in strict mode, and calls whose result shows a failure count too.
+
+    Args:
+        results (defaultdict): Function name to [latency, ...]
+        fn (callable): db_handler function
+        ok (callable, optional): ok(result) -> False if the call failed. Defaults to None.
+    """
+    start = time.perf_counter()
+    try:
+        result = fn(*args)
+    except Exception:
+        results[fn.__name__].append(None)
+        return
+    latency = time.perf_counter() - start
+    results[fn.__name__].append(latency if ok is None or ok(result) else None)
+
+
+def succeeded(result):
+    return result == "Success"
+
+
+def returned(result):
+    return result is not None
+
+
+def simulate_user(db, name, rates, deadline, rng, results):
+    """
+    Runs one user's operations until the deadline, arriving as a Poisson process.
+
+    Args:
+        db (module): util.db_handler
+        name (str): Username
+        rates (dict): Operation to operations per minute
+        deadline (float): time.monotonic() to stop at
+        rng (random.Random): Random source of this user
+        results (defaultdict): Function name to [latency, ...], None for failures
+    """
+    ops = list(rates)
+    weights = [rates[i] for i in ops]
+    total = sum(weights) / 60
+    saved = set()
+
+    while True:
+        time.sleep(rng.expovariate(total))
+        if time.monotonic() > deadline:
+            return
+        op = rng.choices(ops, weights)[0]
+        if op == "login":
+            timed(results, db.login, name, PASSWORD, ok=succeeded)
+            timed(results, db.get_fav_topics, name, ok=returned)
+        elif op == "topics":
+            timed(results, db.update_topics, name, rng.sample(TOPICS, 3), ok=succeeded)
+        else:
+            link = f"https://example.com/loadtest/{rng.randrange(ARTICLES)}"
+            timed(results, db.is_saved_article, name, link, ok=returned)
+            if link in saved:
+                timed(results, db.unsave_article, name, link, ok=succeeded)
+                saved.discard(link)
+            else:
+                timed(
+                    results, db.save_article, name, "Load test", link, "", ok=succeeded
+                )
+                saved.add(link)
+            timed(results, db.get_saved_articles, name, 20, ok=returned)
+
+
+def run_process(args):
+    """
+    Simulates a group of users in one process, one thread each.
+    They share the process' connection like the threads of the app do.
+
+    Returns:
+        dict: Function name to [latency, ...]
+    """
+    users, rates, duration, seed = args
+    sys.path.append(os.curdir)
+    import util.db_handler as db
+
+    # A forked process would otherwise reuse the parent's socket
+    db.db.db = None
+    db.db.strict = True
+
+    results = defaultdict(list)
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(
+            target=simulate_user,
+            args=(db, username(i), rates, deadline, random.Random(seed + i), results),
+        )
+        for i in users
+    ]
+    for i in threads:
+        i.start()
+    for i in threads:
+        i.join()
+    return dict(results)
+
+
+def setup(n):
+    sys.path.append(os.curdir)
+    import util.db_handler as db
+
+    cleanup()
+    with open(os.path.join(db.PFP_PATH, "default_pfp.png"), "rb") as f:
+        pfp = f.read()
+    for i in range(n):
+        db.register(username(i), PASSWORD, pfp)
+
+
+def cleanup():
+    import util.db_handler as db
+
+    users = f'SELECT id FROM users WHERE username LIKE "{USER_PREFIX}%"'
+    db.db.data_change(
+        f"DELETE FROM saved_articles WHERE user_id IN ({users}); "
+        f"DELETE FROM fav_topics WHERE user_id IN ({users}); "
+        f'DELETE FROM users WHERE username LIKE "{USER_PREFIX}%";'
+    )
+    for i in os.listdir(db.PFP_PATH):
+        if i.startswith(USER_PREFIX):
+            os.remove(os.path.join(db.PFP_PATH, i))
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def report(results, duration):
+    print(
+        f"\n{'function':<20}{'calls':>8}{'errors':>8}{'ops/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+    )
+    for name, latencies in sorted(results.items()):
+        ok = [i * 1000 for i in latencies if i is not None]
+        errors = len(latencies) - len(ok)
+        if not ok:
+            print(f"{name:<20}{len(latencies):>8}{errors:>8}")
+            continue
+        print(
+            f"{name:<20}{len(latencies):>8}{errors:>8}{len(ok) / duration:>9.1f}"
+            f"{statistics.median(ok):>9.1f}{percentile(ok, 0.99):>9.1f}{max(ok):>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--login-rate", type=float, default=2)
+    parser.add_argument("--topic-rate", type=float, default=4)
+    parser.add_argument("--save-rate", type=float, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rates = {
+        "login": args.login_rate,
+        "topics": args.topic_rate,
+        "save": args.save_rate,
+    }
+    processes = max(1, min(args.processes, args.users))
+
+    print(f"Registering {args.users} users...")
+    setup(args.users)
+    try:
+        print(
+            f"Running {args.users} users in {processes} processes for {args.duration:.0f} s..."
+        )
+        groups = [
+            (range(args.users)[i::processes], rates, args.duration, args.seed)
+            for i in range(processes)
+        ]
+        results = defaultdict(list)
+        with Pool(processes) as pool:
+            for i in pool.map(run_process, groups):
+                for name, latencies in i.items():
+                    results[name].extend(latencies)
+        report(results, args.duration)
+    finally:
+        cleanup()
@@ -0,0 +1,144 @@
+import time
+
+HEADERS = {"Referer": "https://www.google.com/", "User-Agent": "Mozilla/5.0"}
+
+CONNECT_TIMEOUT = 5  # seconds
+READ_TIMEOUT = 10  # seconds without receiving a byte
+TOTAL_TIMEOUT = 30  # seconds for the whole body
+CHUNK_SIZE = 64 * 1024
+
+# Byte caps by content type family, the kind requested is used when the server doesn't say
+LIMITS = {
+    "feed": 5 * 1024 * 1024,
+    "html": 3 * 1024 * 1024,
+    "image": 4 * 1024 * 1024,
+}
+# The first scans of a progressive JPEG already hold the whole picture at
+# a lower quality, which is plenty for a thumbnail
+PROGRESSIVE_JPEG_BYTES = 512 * 1024
+
+
+class DownloadError(IOError):
+    pass
+
+
+def content_kind(content_type, kind):
+    content_type = (content_type or "").lower()
+    if content_type.startswith("image/"):
+        return "image"
+    if "html" in content_type:
+        return "html"
+    if "xml" in content_type or "rss" in content_type or "atom" in content_type:
+        return "feed"
+    return kind
+
+
+def download(url, kind="html", until=None):
+    """
+    Streams a response in chunks, giving up as soon as it breaks a limit.
+
+    Args:
+        url (str): URL
+        kind (str, optional): "feed", "html" or "image", for the byte cap. Defaults to "html".
+        until (bytes, optional): Stop reading once this appears, e.g. b"</head>". Defaults to None.
+
+    Raises:
+        DownloadError: The body is over its cap or took longer than TOTAL_TIMEOUT
+        requests.RequestException: The request failed or timed out
+
+    Returns:
+        bytes: The body, or its start if until was found
+    """
+    import requests
+
+    deadline = time.monotonic() + TOTAL_TIMEOUT
+    with requests.get(
+        url,
+        headers=HEADERS,
+        stream=True,
+        timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+    ) as response:
+        response.raise_for_status()
+        limit = LIMITS[content_kind(response.headers.get("Content-Type"), kind)]
+        length = response.headers.get("Content-Length")
+        if not until and length and length.isdigit() and int(length) > limit:
+            raise DownloadError(f"{url} is {length} bytes, over the {limit} byte cap")
+
+        data = bytearray()
+        for chunk in response.iter_content(CHUNK_SIZE):
+            data += chunk
+            if len(data) > limit:
+                raise DownloadError(f"{url} is over the {limit} byte cap")
+            if until and until in data[-len(chunk) - len(until) :]:
+                break
+            if time.monotonic() > deadline:
+                raise DownloadError(f"{url} took over {TOTAL_TIMEOUT} seconds")
+        return bytes(data)
+
+
+def download_image(url):
+    """
+    Streams an image, stopping once there is enough of it for a thumbnail.
+
+    The header is parsed as the bytes arrive, so images too large to decode
+    are dropped after the first chunk. Progressive JPEGs stop after
+    PROGRESSIVE_JPEG_BYTES, the first scans are enough for a thumbnail
+    (see thumbnail.make_thumbnail). Other images over the image cap are
+    dropped, as soon as Content-Length or the bytes received show it.
+
+    Args:
+        url (str): Image URL
+
+    Raises:
+        DownloadError: The image is over its cap, too large to decode or took longer than TOTAL_TIMEOUT
+        requests.RequestException: The request failed or timed out
+
+    Returns:
+        bytes: The encoded image, truncated only if it is a progressive JPEG
+    """
+    import requests
+    from PIL import ImageFile
+
+    from util.thumbnail import MAX_PIXELS
+
+    deadline = time.monotonic() + TOTAL_TIMEOUT
+    with requests.get(
+        url,
+        headers=HEADERS,
+        stream=True,
+        timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+    ) as response:
+        response.raise_for_status()
+        limit = LIMITS["image"]
+        length = response.headers.get("Content-Length")
+        length = int(length) if length and length.isdigit() else 0
+        progressive = False
+        parser = ImageFile.Parser()
+        data = bytearray()
+        for chunk in response.iter_content(CHUNK_SIZE):
+            data += chunk
+            if parser.image is None:
+                try:
+                    parser.feed(chunk)
+                except Exception:
+                    pass  # not something Pillow can read, let the decoder report it
+                if parser.image is not None:
+                    w, h = parser.image.size
+                    # draft() decodes JPEGs at down to 1/8 scale
+                    pixels = w * h // (64 if parser.image.format == "JPEG" else 1)
+                    if pixels > MAX_PIXELS:
+                        raise DownloadError(f"{url} is too large to decode: {w}x{h}")
+                    progressive = bool(parser.image.info.get("progressive"))
+                    if progressive:
+                        limit = PROGRESSIVE_JPEG_BYTES
+                    elif length > limit:
+                        raise DownloadError(
+                            f"{url} is {length} bytes, over the {limit} byte cap"
+                        )
+            if progressive and len(data) >= limit:
+                break
+            if len(data) > limit:
+                raise DownloadError(f"{url} is over the {limit} byte cap")
+            if time.monotonic() > deadline:
+                raise DownloadError(f"{url} took over {TOTAL_TIMEOUT} seconds")
+        return bytes(data)
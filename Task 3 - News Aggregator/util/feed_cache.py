@@ -0,0 +1,162 @@
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+FEED_TTL = 300  # seconds, for feeds without an interval of their own
+# A polled feed stays fresh a little past its interval, so the poller refreshes it first
+POLL_SLACK = 60  # seconds
+MAX_AGE = 24 * 60 * 60  # rows older than this are pruned from the database
+
+
+class FeedCache:
+    def __init__(self, ttl=FEED_TTL, path=None):
+        """
+        Process-wide cache of parsed feeds, shared by every session and topic.
+
+        Args:
+            ttl (int, optional): Seconds a fetched feed stays fresh. Defaults to FEED_TTL.
+            path (str, optional): SQLite file to share the cache across processes. Defaults to None (memory only).
+        """
+        self.ttl = ttl
+        self.ttls = {}  # url -> seconds, see set_intervals
+        self.entries = {}  # url -> (fetched_at, items)
+        self.in_flight = {}  # url -> Future
+        self.lock = threading.Lock()
+        self.path = None
+        if path:
+            self.use_sqlite(path)
+
+    def use_sqlite(self, path):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS feeds (url TEXT PRIMARY KEY, fetched_at REAL NOT NULL, items TEXT NOT NULL)"
+            )
+
+    def _connect(self):
+        # One connection per call, sqlite3 connections can't be shared between threads
+        return sqlite3.connect(self.path, timeout=10)
+
+    def _load(self, url):
+        if not self.path:
+            return None
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT fetched_at, items FROM feeds WHERE url = ?", (url,)
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def _store(self, url, fetched_at, items):
+        if not self.path:
+            return
+        with self._connect() as conn:
+            conn.execute(
+                "REPLACE INTO feeds (url, fetched_at, items) VALUES (?, ?, ?)",
+                (url, fetched_at, json.dumps(items)),
+            )
+            conn.execute(
+                "DELETE FROM feeds WHERE fetched_at < ?", (fetched_at - MAX_AGE,)
+            )
+
+    def set_intervals(self, intervals):
+        """
+        Keeps each feed fresh for its poll interval, so the GUI uses what
+        the poller fetched instead of refetching it.
+
+        Args:
+            intervals (dict): URL to poll interval in seconds, see FeedRegistry.intervals
+        """
+        self.ttls = {url: i + POLL_SLACK for url, i in intervals.items()}
+
+    def ttl_of(self, url):
+        return self.ttls.get(url, self.ttl)
+
+    def is_fresh(self, url, entry):
+        return entry is not None and time.time() - entry[0] < self.ttl_of(url)
+
+    def get(self, url, fetch, force=False):
+        """
+        Gets the parsed items of a feed, fetching it if it isn't cached or has expired.
+        Concurrent calls for the same URL share a single fetch.
+
+        Args:
+            url (str): Feed URL
+            fetch (callable): fetch(url) -> list of item dicts
+            force (bool, optional): Fetch even if the cached feed is fresh. Defaults to False.
+
+        Returns:
+            list: Copies of the cached item dicts, safe to modify
+        """
+        with self.lock:
+            entry = self.entries.get(url)
+            if self.is_fresh(url, entry) and not force:
+                return [dict(i) for i in entry[1]]
+            future = self.in_flight.get(url)
+            owner = future is None
+            if owner:
+                future = self.in_flight[url] = Future()
+
+        if not owner:
+            return [dict(i) for i in future.result()]
+
+        try:
+            entry = None if force else self._load(url)
+            if not self.is_fresh(url, entry):
+                entry = (time.time(), fetch(url))
+                self._store(url, *entry)
+            with self.lock:
+                self.entries[url] = entry
+            future.set_result(entry[1])
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[url]
+        return [dict(i) for i in entry[1]]
+
+    def is_cached(self, url):
+        """
+        Checks if a feed can be served without fetching it.
+
+        Args:
+            url (str): Feed URL
+
+        Returns:
+            bool: True if a fresh copy is in memory or in the database
+        """
+        with self.lock:
+            if self.is_fresh(url, self.entries.get(url)):
+                return True
+        entry = self._load(url)
+        if not self.is_fresh(url, entry):
+            return False
+        with self.lock:
+            self.entries[url] = entry
+        return True
+
+    def fetched_at(self):
+        """
+        Returns:
+            dict: URL to the time each cached feed was fetched, from memory and the database
+        """
+        times = {}
+        if self.path:
+            with self._connect() as conn:
+                times.update(conn.execute("SELECT url, fetched_at FROM feeds"))
+        with self.lock:
+            for url, entry in self.entries.items():
+                times[url] = max(times.get(url, 0), entry[0])
+        return times
+
+    def invalidate(self, url):
+        with self.lock:
+            self.entries.pop(url, None)
+        if self.path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM feeds WHERE url = ?", (url,))
+
+
+feed_cache = FeedCache()
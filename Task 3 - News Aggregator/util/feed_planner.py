@@ -0,0 +1,138 @@
+import hashlib
+import time
+
+from util.feed_cache import feed_cache
+from util.feed_registry import fetch_concurrently
+from util.ranking import _timestamp
+from util.xml_parser import get_articles_from_rss
+
+PAGE_SIZE = 15
+MIN_PER_FEED = 3  # don't fetch a whole feed for one or two items
+# Extra items taken from every fetched feed, so ranking picks the page
+# rather than the planner. They are already parsed, so they cost nothing.
+EXTRA_PER_FEED = 2
+
+
+def split(total, n):
+    """Splits total into n near-equal parts, the larger ones first."""
+    return [total // n + (1 if i < total % n else 0) for i in range(n)]
+
+
+def feeds_for(quota, available):
+    """Most feeds that still get MIN_PER_FEED items each, at least one."""
+    return min(available, max(quota // MIN_PER_FEED, 1))
+
+
+def newest_first(items):
+    return sorted(items, key=lambda i: _timestamp(i) or 0, reverse=True)
+
+
+class FeedPlanner:
+    def __init__(self, feeds, cache=feed_cache, fetch=get_articles_from_rss):
+        """
+        Decides which feeds to fetch for a page and how many items to take from each.
+
+        Args:
+            feeds (dict): Topic to list of feed URLs
+            cache (FeedCache, optional): Parsed item cache. Defaults to the shared feed_cache.
+            fetch (callable, optional): fetch(url) on a cache miss. Defaults to get_articles_from_rss.
+        """
+        self.feeds = feeds
+        self.cache = cache
+        self.fetch = fetch
+
+    def candidates(self, topic):
+        """
+        Feeds of a topic in the order they should be used: cached ones first
+        since they cost nothing, then the rest in an order that rotates every
+        cache TTL so successive refreshes sample different feeds.
+        """
+        slot = int(time.time() // self.cache.ttl)
+        return sorted(
+            self.feeds.get(topic, []),
+            key=lambda url: (
+                not self.cache.is_cached(url),
+                hashlib.sha1(f"{slot}{url}".encode()).hexdigest(),
+            ),
+        )
+
+    def plan(self, topics, page_size=PAGE_SIZE):
+        """
+        Splits the page between the topics, then each topic's share between
+        as few of its feeds as needed, at least MIN_PER_FEED items each
+        unless the share itself is smaller.
+
+        Args:
+            topics (iterable): Topics of the page
+            page_size (int, optional): Articles on the page. Defaults to PAGE_SIZE.
+
+        Returns:
+            list: [(topic, [(url, quota), ...], [spare url, ...]), ...]
+        """
+        topics = [i for i in topics if self.feeds.get(i)]
+        if not topics:
+            return []
+        plan = []
+        for topic, quota in zip(topics, split(page_size, len(topics))):
+            if not quota:
+                continue
+            feeds = self.candidates(topic)
+            n = feeds_for(quota, len(feeds))
+            plan.append((topic, list(zip(feeds[:n], split(quota, n))), feeds[n:]))
+        return plan
+
+    def get(self, url):
+        return self.cache.get(url, self.fetch)
+
+    def fill(self, topics, page_size=PAGE_SIZE):
+        """
+        Fetches the planned feeds and takes their quota of newest items, plus
+        EXTRA_PER_FEED candidates each for rank_articles to choose from.
+        A topic whose feeds fail or come up short is topped up from its
+        spare feeds, and the page from the items already fetched.
+
+        Args:
+            topics (iterable): Topics of the page
+            page_size (int, optional): Articles on the page. Defaults to PAGE_SIZE.
+
+        Returns:
+            list: At least page_size item dicts tagged with their topic,
+                when the feeds have them, to be ranked down to page_size
+        """
+        plan = self.plan(topics, page_size)
+        fetched = fetch_concurrently(
+            [url for _, quotas, _ in plan for url, _ in quotas], self.get
+        )
+
+        picked = {}  # link -> item
+        leftovers = []
+
+        def take(topic, items, quota):
+            """Takes up to quota + EXTRA_PER_FEED items, returns the quota covered."""
+            taken = 0
+            for i in newest_first(items):
+                i["topic"] = topic
+                if taken < quota + EXTRA_PER_FEED and i["link"] not in picked:
+                    picked[i["link"]] = i
+                    taken += 1
+                else:
+                    leftovers.append(i)
+            return min(taken, quota)
+
+        for topic, quotas, spare in plan:
+            missing = sum(
+                quota - take(topic, fetched.get(url, []), quota)
+                for url, quota in quotas
+            )
+            while missing > 0 and spare:
+                n = feeds_for(missing, len(spare))
+                extra, spare = spare[:n], spare[n:]
+                results = fetch_concurrently(extra, self.get)
+                for url, quota in zip(extra, split(missing, n)):
+                    missing -= take(topic, results.get(url, []), quota)
+
+        for i in newest_first(leftovers):
+            if len(picked) >= page_size:
+                break
+            picked.setdefault(i["link"], i)
+        return list(picked.values())
@@ -0,0 +1,301 @@
+"""
+Feed registry and poller.
+
+Usage (from the directory containing script.py):
+    python util/feed_registry.py import <file.opml> [topic]
+    python util/feed_registry.py poll [--shards N --shard I]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+FEEDS_FILE = os.path.join(os.curdir, "assets", "rss_feeds.json")
+REGISTRY_FILE = os.path.join(os.curdir, "settings", "feed_registry.json")
+
+DEFAULT_INTERVAL = 15 * 60  # seconds between polls of a feed
+HOST_CONCURRENCY = 2  # simultaneous requests per host
+MAX_WORKERS = 16
+
+
+def _hash(url):
+    return int(hashlib.sha1(url.encode()).hexdigest()[:8], 16)
+
+
+class FeedRegistry:
+    def __init__(self, path=REGISTRY_FILE):
+        """
+        Feeds by URL, with their topic and poll interval.
+        Starts from assets/rss_feeds.json until feeds are added.
+
+        Args:
+            path (str, optional): JSON file the registry is saved to. Defaults to REGISTRY_FILE.
+        """
+        self.path = path
+        self.feeds = (
+            {}
+        )  # url -> {"url": ..., "topic": ..., "interval": ..., "title": ...}
+        self.lock = threading.Lock()
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                for feed in json.load(f):
+                    self.feeds[feed["url"]] = feed
+        else:
+            with open(FEEDS_FILE, "r") as f:
+                for topic, urls in json.load(f).items():
+                    for url in urls:
+                        self.add(url, topic)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self.lock:
+            with open(self.path + ".tmp", "w") as f:
+                json.dump(list(self.feeds.values()), f, indent=2)
+            os.replace(self.path + ".tmp", self.path)
+
+    def add(self, url, topic, interval=DEFAULT_INTERVAL, title=None):
+        with self.lock:
+            self.feeds[url] = {
+                "url": url,
+                "topic": topic.lower(),
+                "interval": interval,
+                "title": title,
+            }
+
+    def remove(self, url):
+        with self.lock:
+            self.feeds.pop(url, None)
+
+    def topics(self):
+        """
+        Returns:
+            dict: Topic to list of feed URLs, like assets/rss_feeds.json
+        """
+        topics = {}
+        with self.lock:
+            for feed in self.feeds.values():
+                topics.setdefault(feed["topic"], []).append(feed["url"])
+        return topics
+
+    def intervals(self):
+        """
+        Returns:
+            dict: Feed URL to poll interval in seconds
+        """
+        with self.lock:
+            return {url: feed["interval"] for url, feed in self.feeds.items()}
+
+    def import_opml(self, path, default_topic="imported", interval=DEFAULT_INTERVAL):
+        """
+        Adds the feeds of an OPML file. Feeds nested in an outline take its text as topic.
+
+        Args:
+            path (str): OPML file
+            default_topic (str, optional): Topic for top level feeds. Defaults to "imported".
+            interval (int, optional): Poll interval for the new feeds. Defaults to DEFAULT_INTERVAL.
+
+        Returns:
+            int: Number of feeds added
+        """
+        count = 0
+
+        def walk(outline, topic):
+            nonlocal count
+            url = outline.get("xmlUrl")
+            if url:
+                self.add(
+                    url,
+                    outline.get("category") or topic,
+                    interval,
+                    outline.get("title") or outline.get("text"),
+                )
+                count += 1
+            for child in outline.findall("outline"):
+                walk(child, outline.get("text") if not url else topic)
+
+        body = ET.parse(path).getroot().find("body")
+        for outline in body.findall("outline"):
+            walk(outline, default_topic)
+        self.save()
+        return count
+
+
+class HostLimiter:
+    def __init__(self, limit=HOST_CONCURRENCY):
+        """Limits the number of simultaneous requests to each host."""
+        self.limit = limit
+        self.semaphores = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.semaphores:
+                self.semaphores[host] = threading.BoundedSemaphore(self.limit)
+            return self.semaphores[host]
+
+
+host_limiter = HostLimiter()
+
+
+def fetch_concurrently(urls, fetch, limiter=host_limiter, max_workers=MAX_WORKERS):
+    """
+    Fetches feeds in parallel, with at most limiter.limit requests per host.
+
+    Args:
+        urls (iterable): Feed URLs
+        fetch (callable): fetch(url) -> result
+        limiter (HostLimiter, optional): Per host limit. Defaults to the shared host_limiter.
+        max_workers (int, optional): Threads. Defaults to MAX_WORKERS.
+
+    Returns:
+        dict: URL to result, failed feeds are left out
+    """
+
+    def limited(url):
+        with limiter(url):
+            return fetch(url)
+
+    urls = list(dict.fromkeys(urls))
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {url: executor.submit(limited, url) for url in urls}
+        for url, future in futures.items():
+            try:
+                results[url] = future.result()
+            except Exception as e:
+                print(f"Couldn't fetch {url}: {e}")
+    return results
+
+
+class PollScheduler:
+    def __init__(
+        self, registry, fetch, shards=1, shard=0, limiter=host_limiter, cache=None
+    ):
+        """
+        Polls the registry's feeds, each one at its own interval.
+
+        Every feed gets a fixed phase within its interval, derived from its URL,
+        so feeds with the same interval are spread over time instead of all
+        being due at once. Feeds are also split into shards by URL, so several
+        pollers (threads or processes) can share the registry.
+
+        Polling resumes from the cache: a feed it already holds waits for its
+        next slot after it was fetched, any other feed for its next slot after
+        the start, so starting doesn't fetch every feed at once.
+
+        Args:
+            registry (FeedRegistry): Feeds to poll
+            fetch (callable): fetch(url), e.g. a feed cache refresh
+            shards (int, optional): Total number of pollers. Defaults to 1.
+            shard (int, optional): Index of this poller. Defaults to 0.
+            limiter (HostLimiter, optional): Per host limit. Defaults to the shared host_limiter.
+            cache (FeedCache, optional): Where fetch stores feeds, to resume from. Defaults to None.
+        """
+        self.registry = registry
+        self.fetch = fetch
+        self.shards = shards
+        self.shard = shard
+        self.limiter = limiter
+        self.started = time.time()
+        self.last_polled = cache.fetched_at() if cache else {}
+
+    def last_due(self, feed, now):
+        """The most recent time the feed was due, its phase plus a whole number of intervals."""
+        interval = feed["interval"]
+        phase = _hash(feed["url"]) % interval
+        return now - (now - phase) % interval
+
+    def due(self, now=None):
+        """
+        Returns:
+            list: Feeds of this shard that haven't been polled since they were last due
+        """
+        now = time.time() if now is None else now
+        with self.registry.lock:
+            feeds = list(self.registry.feeds.values())
+        return [
+            feed
+            for feed in feeds
+            if _hash(feed["url"]) % self.shards == self.shard
+            and self.last_polled.get(feed["url"], self.started)
+            < self.last_due(feed, now)
+        ]
+
+    def run_once(self, now=None):
+        """
+        Polls the due feeds.
+
+        Returns:
+            int: Number of feeds polled successfully
+        """
+        now = time.time() if now is None else now
+        due = [feed["url"] for feed in self.due(now)]
+        results = fetch_concurrently(due, self.fetch, self.limiter)
+        for url in due:
+            # failed feeds wait for their next slot too, instead of being retried every tick
+            self.last_polled[url] = now
+        return len(results)
+
+    def run_forever(self, stop_event=None, tick=5):
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            self.run_once()
+            stop_event.wait(tick)
+
+    def start(self, tick=5):
+        """
+        Polls in a daemon thread.
+
+        Returns:
+            threading.Event: Set it to stop polling
+        """
+        stop_event = threading.Event()
+        threading.Thread(
+            target=self.run_forever, args=(stop_event, tick), daemon=True
+        ).start()
+        return stop_event
+
+
+if __name__ == "__main__":
+    sys.path.append(os.curdir)
+    from util.feed_cache import feed_cache
+    from util.xml_parser import get_articles_from_rss
+
+    parser = argparse.ArgumentParser(description="Manage and poll the feed registry")
+    commands = parser.add_subparsers(dest="command", required=True)
+    opml = commands.add_parser("import", help="import feeds from an OPML file")
+    opml.add_argument("file")
+    opml.add_argument("topic", nargs="?", default="imported")
+    poll = commands.add_parser(
+        "poll", help="keep the shared feed cache (settings/feed_cache.db) fresh"
+    )
+    poll.add_argument("--shards", type=int, default=1)
+    poll.add_argument("--shard", type=int, default=0)
+    args = parser.parse_args()
+
+    registry = FeedRegistry()
+    if args.command == "import":
+        print(f"Imported {registry.import_opml(args.file, args.topic)} feeds")
+    else:
+        feed_cache.use_sqlite(os.path.join(os.curdir, "settings", "feed_cache.db"))
+        feed_cache.set_intervals(registry.intervals())
+        scheduler = PollScheduler(
+            registry,
+            lambda url: feed_cache.get(url, get_articles_from_rss, force=True),
+            args.shards,
+            args.shard,
+            cache=feed_cache,
+        )
+        print(f"Polling shard {args.shard + 1}/{args.shards}, Ctrl+C to stop")
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,66 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ImageLoader:
+    def __init__(self, max_workers=4):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="image_loader"
+        )
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def request(self, key, load, callback):
+        """
+        Queues an image load, unless one is already pending for the key.
+
+        Args:
+            key (hashable): Identifies the request, used to cancel it
+            load (callable): Called in a worker thread, returns the image
+            callback (callable): Called in the worker thread with the image once loaded
+        Returns:
+            None
+        """
+        with self.lock:
+            if key in self.pending:
+                return
+            future = self.executor.submit(load)
+            self.pending[key] = future
+        future.add_done_callback(lambda f: self._done(key, f, callback))
+
+    def cancel(self, key):
+        """
+        Cancels the pending load for the key if it hasn't started yet.
+
+        Args:
+            key (hashable): Key the load was requested with
+
+        Returns:
+            bool: True if the load was cancelled
+        """
+        with self.lock:
+            future = self.pending.get(key)
+            if future is None or not future.cancel():
+                return False
+            del self.pending[key]
+            return True
+
+    def is_pending(self, key):
+        with self.lock:
+            return key in self.pending
+
+    def _done(self, key, future, callback):
+        with self.lock:
+            if self.pending.get(key) is future:
+                del self.pending[key]
+        if future.cancelled():
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"Error while loading image: {e}")
+            result = None
+        callback(result)
+
+
+image_loader = ImageLoader()
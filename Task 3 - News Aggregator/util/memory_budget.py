@@ -0,0 +1,88 @@
+import threading
+from collections import OrderedDict
+
+IMAGE_BYTES = 250 * 175 * 4  # Tk keeps photo images as 32 bit pixels
+CARD_BYTES = 16 * 1024  # widgets and save/unsave icons of an article card
+DEFAULT_BUDGET = 12 * 1024 * 1024
+
+
+def estimate_footprint(cards, images):
+    """
+    Estimates the resident Tk memory of a feed.
+
+    Args:
+        cards (int): Number of article cards
+        images (int): Number of loaded thumbnails
+
+    Returns:
+        int: Bytes
+    """
+    return cards * CARD_BYTES + images * IMAGE_BYTES
+
+
+class MemoryBudget:
+    def __init__(self, limit=DEFAULT_BUDGET):
+        """
+        Footprints of the loaded tabs, in the order they were viewed.
+        Feeds load on worker threads while the Tk thread evicts, so every
+        method holds the lock.
+        """
+        self.limit = limit
+        self.usage = OrderedDict()  # tab -> bytes, least recently viewed first
+        self.pinned = set()  # tabs that are loading
+        self.lock = threading.RLock()
+
+    def update(self, tab, nbytes):
+        """Records the footprint of a tab without changing its position."""
+        with self.lock:
+            self.usage[tab] = nbytes
+
+    def touch(self, tab):
+        """Marks a tab as the most recently viewed."""
+        with self.lock:
+            if tab in self.usage:
+                self.usage.move_to_end(tab)
+
+    def remove(self, tab):
+        with self.lock:
+            self.usage.pop(tab, None)
+
+    def pin(self, tab):
+        """Keeps a tab from being evicted while its feed is loading."""
+        with self.lock:
+            self.pinned.add(tab)
+
+    def unpin(self, tab):
+        with self.lock:
+            self.pinned.discard(tab)
+
+    def is_pinned(self, tab):
+        with self.lock:
+            return tab in self.pinned
+
+    def total(self):
+        with self.lock:
+            return sum(self.usage.values())
+
+    def to_evict(self, protect=()):
+        """
+        Picks the least recently viewed tabs to evict until the total fits the budget.
+        Pinned tabs are never picked.
+
+        Args:
+            protect (iterable, optional): Tabs that must not be evicted. Defaults to ().
+
+        Returns:
+            list: Tabs to evict
+        """
+        with self.lock:
+            excess = self.total() - self.limit
+            evict = []
+            for tab, nbytes in self.usage.items():
+                if excess <= 0:
+                    break
+                if tab in protect or tab in self.pinned:
+                    continue
+                evict.append(tab)
+                excess -= nbytes
+            return evict
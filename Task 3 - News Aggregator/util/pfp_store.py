@@ -0,0 +1,118 @@
+import functools
+import os
+from io import BytesIO
+
+from PIL import Image, ImageChops, ImageDraw
+
+PFP_SIZES = (40, 100, 256)
+STORE_DIR = os.path.join(os.curdir, "assets", ".cache", "pfp")
+
+
+@functools.lru_cache(maxsize=None)
+def circle_mask(size):
+    """
+    Anti-aliased circle mask and outline ring, supersampled once per size.
+
+    Args:
+        size (tuple): (width, height)
+
+    Returns:
+        tuple: (mask, ring) - "L" mask of the circle, "RGBA" black outline
+    """
+    bigsize = (size[0] * 10, size[1] * 10)
+
+    mask = Image.new("L", bigsize, 0)
+    ImageDraw.Draw(mask).ellipse((0, 0) + bigsize, fill=255)
+    mask = mask.resize(size, Image.Resampling.LANCZOS)
+
+    ring_alpha = Image.new("L", bigsize, 0)
+    ImageDraw.Draw(ring_alpha).ellipse((0, 0) + bigsize, outline=255, width=15)
+    ring = Image.new("RGBA", size, (0, 0, 0, 0))
+    ring.putalpha(ring_alpha.resize(size, Image.Resampling.LANCZOS))
+
+    return mask, ring
+
+
+def circle_image(pil_img: Image.Image, resize=(256, 256)):
+    """
+    Crops an image to a circle with a black outline.
+
+    Args:
+        pil_img (PIL.Image.Image): Source image
+        resize (tuple, optional): Output size. Defaults to (256, 256).
+
+    Returns:
+        PIL.Image.Image: RGBA image
+    """
+    im = pil_img.convert("RGBA")
+    im = im.crop(
+        (
+            (im.size[0] - min(im.size)) // 2,
+            (im.size[1] - min(im.size)) // 2,
+            (im.size[0] + min(im.size)) // 2,
+            (im.size[1] + min(im.size)) // 2,
+        )
+    ).resize(resize, Image.Resampling.LANCZOS)
+
+    mask, ring = circle_mask(tuple(resize))
+    im.putalpha(ImageChops.darker(mask, im.split()[-1]))
+    return Image.alpha_composite(im, ring)
+
+
+def variant_path(name, size):
+    return os.path.join(STORE_DIR, f"{name}_{size}.rgba")
+
+
+def render(name, pil_img: Image.Image):
+    """
+    Pre-renders the circular variants of a profile picture as raw RGBA files.
+
+    Args:
+        name (str): Username
+        pil_img (PIL.Image.Image): Profile picture
+
+    Returns:
+        None
+    """
+    os.makedirs(STORE_DIR, exist_ok=True)
+    for size in PFP_SIZES:
+        path = variant_path(name, size)
+        with open(path + ".tmp", "wb") as f:
+            f.write(circle_image(pil_img, (size, size)).tobytes())
+        os.replace(path + ".tmp", path)
+
+
+def render_encoded(name, data):
+    """
+    Pre-renders the variants from encoded image bytes.
+    Runs in a worker process when the process pool is enabled.
+
+    Args:
+        name (str): Username
+        data (bytes): Encoded profile picture
+
+    Returns:
+        None
+    """
+    render(name, Image.open(BytesIO(data)))
+
+
+def load(name, size):
+    """
+    Loads a pre-rendered variant, wrapping the file bytes without decoding or copying.
+
+    Args:
+        name (str): Username
+        size (int): One of PFP_SIZES
+
+    Returns:
+        PIL.Image.Image: RGBA image, or None if the variant isn't rendered
+    """
+    try:
+        with open(variant_path(name, size), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) != size * size * 4:
+        return None
+    return Image.frombuffer("RGBA", (size, size), data, "raw", "RGBA", 0, 1)
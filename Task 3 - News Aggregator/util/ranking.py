@@ -0,0 +1,93 @@
+import datetime
+import math
+
+HALF_LIFE_HOURS = 12
+FAV_TOPIC_BOOST = 0.25
+SOURCE_PENALTY = 0.5
+
+CACHE_SIZE = 32
+
+_cache = {}
+
+
+def _timestamp(article):
+    try:
+        return datetime.datetime.fromisoformat(article["published"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def recency_score(article, newest):
+    """
+    Scores an article by its age relative to the newest article.
+
+    Args:
+        article (dict): Article dictionary
+        newest (float): Timestamp of the newest article being ranked
+
+    Returns:
+        float: 1.0 for the newest article, halving every HALF_LIFE_HOURS. 0 if undated.
+    """
+    ts = _timestamp(article)
+    if ts is None:
+        return 0.0
+    age_hours = max(newest - ts, 0) / 3600
+    return math.pow(0.5, age_hours / HALF_LIFE_HOURS)
+
+
+def rank_articles(articles, limit=15, fav_topics=()):
+    """
+    Selects the top articles by recency, source diversity and favourite topics.
+
+    Recency is measured against the newest article instead of the clock,
+    so the same input always gives the same output and results are cached.
+
+    Args:
+        articles (list): Article dictionaries, with optional 'published', 'source' and 'topic' keys
+        limit (int, optional): Number of articles to select. Defaults to 15.
+        fav_topics (iterable, optional): Topics to boost. Defaults to ().
+
+    Returns:
+        list: The selected articles, best first
+    """
+    fav_topics = frozenset(fav_topics)
+    key = (tuple(a["link"] for a in articles), limit, fav_topics)
+    if key in _cache:
+        return list(_cache[key])
+
+    # Drop duplicate links, the same story is often in several topic feeds
+    unique = {}
+    for a in articles:
+        unique.setdefault(a["link"], a)
+    candidates = list(unique.values())
+
+    timestamps = [t for t in map(_timestamp, candidates) if t is not None]
+    newest = max(timestamps) if timestamps else 0
+    base = {
+        a["link"]: recency_score(a, newest)
+        + (FAV_TOPIC_BOOST if a.get("topic") in fav_topics else 0)
+        for a in candidates
+    }
+
+    # Greedy selection, every pick from a source lowers that source's next score
+    selected = []
+    picked_per_source = {}
+    while candidates and len(selected) < limit:
+        best = max(
+            candidates,
+            key=lambda a: (
+                base[a["link"]]
+                * math.pow(SOURCE_PENALTY, picked_per_source.get(a.get("source"), 0)),
+                a["link"],
+            ),
+        )
+        candidates.remove(best)
+        selected.append(best)
+        picked_per_source[best.get("source")] = (
+            picked_per_source.get(best.get("source"), 0) + 1
+        )
+
+    if len(_cache) >= CACHE_SIZE:
+        _cache.clear()
+    _cache[key] = tuple(selected)
+    return selected
@@ -0,0 +1,212 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from util.downloader import download
+from util.feed_registry import host_limiter
+
+READER_CACHE_FILE = os.path.join(os.curdir, "settings", "reader_cache.db")
+CACHE_LIMIT = 32 * 1024 * 1024  # compressed bytes kept on disk
+MIN_PARAGRAPH = 40  # shorter paragraphs are usually captions, bylines or buttons
+
+
+def extract_text(html):
+    """
+    Extracts the main text of an article page.
+
+    Takes the <article> element if there is one, otherwise the element
+    directly containing the most paragraph text.
+
+    Args:
+        html (bytes): Page HTML
+
+    Returns:
+        dict: {'title': '...', 'paragraphs': ['...', ...]}
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    for i in soup(["script", "style", "nav", "header", "footer", "aside", "form"]):
+        i.decompose()
+
+    title = soup.find("meta", property="og:title")
+    title = title.get("content") if title else None
+    if not title and soup.title:
+        title = soup.title.get_text(strip=True)
+
+    body = soup.find("article")
+    if body is None:
+        scores = {}
+        for p in soup.find_all("p"):
+            scores[p.parent] = scores.get(p.parent, 0) + len(p.get_text(strip=True))
+        body = max(scores, key=scores.get) if scores else soup
+
+    paragraphs = [
+        p.get_text(" ", strip=True)
+        for p in body.find_all("p")
+        if len(p.get_text(strip=True)) >= MIN_PARAGRAPH
+    ]
+    return {"title": title or "", "paragraphs": paragraphs}
+
+
+def fetch_article(url):
+    with host_limiter(url):
+        html = download(url)
+    return extract_text(html)
+
+
+class ReaderCache:
+    def __init__(self, path=READER_CACHE_FILE, limit=CACHE_LIMIT):
+        """
+        Extracted article text, zlib compressed in SQLite.
+        The least recently read articles are evicted past the size limit.
+
+        Args:
+            path (str, optional): SQLite file. Defaults to READER_CACHE_FILE.
+            limit (int, optional): Compressed bytes to keep. Defaults to CACHE_LIMIT.
+        """
+        self.path = path
+        self.limit = limit
+        self.ready = False
+        self.on_evict = None  # on_evict(urls), called after articles are evicted
+
+    def _connect(self):
+        # One connection per call, sqlite3 connections can't be shared between threads
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self.ready:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, data BLOB NOT NULL, size INTEGER NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at)"
+            )
+            self.ready = True
+        return conn
+
+    def has(self, url):
+        with self._connect() as conn:
+            return bool(
+                conn.execute("SELECT 1 FROM pages WHERE url = ?", (url,)).fetchone()
+            )
+
+    def get(self, url):
+        """
+        Returns:
+            dict: The cached article, or None
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if not row:
+                return None
+            conn.execute(
+                "UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url)
+            )
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, url, article):
+        data = zlib.compress(json.dumps(article).encode(), 6)
+        with self._connect() as conn:
+            conn.execute(
+                "REPLACE INTO pages (url, data, size, accessed_at) VALUES (?, ?, ?, ?)",
+                (url, data, len(data), time.time()),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        excess = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        excess -= self.limit
+        if excess <= 0:
+            return
+        evict = []
+        for url, size in conn.execute(
+            "SELECT url, size FROM pages ORDER BY accessed_at"
+        ):
+            if excess <= 0:
+                break
+            evict.append((url,))
+            excess -= size
+        conn.executemany("DELETE FROM pages WHERE url = ?", evict)
+        if self.on_evict:
+            self.on_evict([url for url, in evict])
+
+
+class ReaderPrefetcher:
+    def __init__(self, cache, max_workers=2):
+        """
+        Downloads and extracts the articles in view in the background.
+
+        Args:
+            cache (ReaderCache): Where extracted articles are stored
+            max_workers (int, optional): Simultaneous downloads. Defaults to 2.
+        """
+        self.cache = cache
+        self.enabled = False
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.wanted = set()
+        self.pending = set()
+        self.cached = set()  # fetched by this session, skipped without asking the cache
+        self.lock = threading.Lock()
+        cache.on_evict = self.forget
+
+    def prefetch(self, urls):
+        """
+        Queues the articles not cached yet. Queued articles that are no
+        longer in urls are skipped, so only what is in view gets fetched.
+
+        Args:
+            urls (iterable): Article links currently in view
+        """
+        if not self.enabled:
+            return
+        with self.lock:
+            self.wanted = set(urls)
+            for url in self.wanted - self.pending - self.cached:
+                self.pending.add(url)
+                self.executor.submit(self._fetch, url)
+
+    def forget(self, urls):
+        """Drops evicted articles from cached, so they are prefetched again."""
+        with self.lock:
+            self.cached.difference_update(urls)
+
+    def _fetch(self, url):
+        try:
+            with self.lock:
+                if url not in self.wanted:
+                    return
+            if not self.cache.has(url):
+                self.cache.put(url, fetch_article(url))
+            with self.lock:
+                self.cached.add(url)
+        except Exception:
+            pass
+        finally:
+            with self.lock:
+                self.pending.discard(url)
+
+    def load(self, url):
+        """
+        Gets an article from the cache, fetching it if needed.
+        Called from a worker thread.
+
+        Returns:
+            dict: The article, or None if it isn't cached and couldn't be fetched
+        """
+        article = self.cache.get(url)
+        if article is None:
+            try:
+                article = fetch_article(url)
+            except Exception:
+                return None
+            self.cache.put(url, article)
+        return article
+
+
+reader_cache = ReaderCache()
+reader_prefetcher = ReaderPrefetcher(reader_cache)
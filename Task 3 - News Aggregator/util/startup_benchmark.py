@@ -0,0 +1,116 @@
+"""
+Measures how long the News Aggregator takes to import and to show the login screen.
+
+Usage: python util/startup_benchmark.py [runs]
+Run it from the directory containing script.py.
+"""
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+RUNS = 5
+
+STARTUP_CODE = """
+import time
+start = time.perf_counter()
+import script
+imported = time.perf_counter()
+import tkinter as tk
+script.root = tk.Tk()
+script.theme = script.Theme(script.root, "dark")
+app = script.NewsAggregator()
+app.start_news()
+app.update()
+shown = time.perf_counter()
+print(f"import={imported - start} login={shown - start}")
+script.root.destroy()
+"""
+
+
+def run_startup():
+    """
+    Starts the app in a fresh interpreter up to the first drawn login screen.
+
+    Returns:
+        tuple: (import seconds, login screen seconds), login is None without a display
+    """
+    r = subprocess.run(
+        [sys.executable, "-c", STARTUP_CODE],
+        capture_output=True,
+        text=True,
+        cwd=os.curdir,
+    )
+    m = re.search(r"import=([\d.]+) login=([\d.]+)", r.stdout)
+    if m:
+        return float(m.group(1)), float(m.group(2))
+
+    # No display (or no Tk), fall back to timing the import alone
+    r = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import time; s = time.perf_counter(); import script; print(f'import={time.perf_counter() - s}')",
+        ],
+        capture_output=True,
+        text=True,
+        cwd=os.curdir,
+    )
+    m = re.search(r"import=([\d.]+)", r.stdout)
+    if not m:
+        raise Exception(f"Couldn't start the app:\n{r.stderr}")
+    return float(m.group(1)), None
+
+
+def slowest_imports(n=10):
+    """
+    Lists the modules imported by script.py with the largest cumulative import time,
+    from python -X importtime.
+
+    Args:
+        n (int, optional): Number of modules. Defaults to 10.
+
+    Returns:
+        list: [(microseconds, module), ...]
+    """
+
+    def importtime(code):
+        r = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True,
+            text=True,
+            cwd=os.curdir,
+        )
+        imports = {}
+        for line in r.stderr.splitlines():
+            m = re.match(r"import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)", line)
+            # Only direct imports, nested ones are included in their parents
+            if m and len(m.group(2)) == 3:
+                imports[m.group(3)] = int(m.group(1))
+        return imports
+
+    # Leave out what the interpreter imports on its own (site hooks etc.)
+    baseline = importtime("pass")
+    imports = [
+        (j, i) for i, j in importtime("import script").items() if i not in baseline
+    ]
+    return sorted(imports, reverse=True)[:n]
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else RUNS
+    results = [run_startup() for _ in range(runs)]
+
+    print(f"import script: {statistics.median(r[0] for r in results) * 1000:.0f} ms")
+    if results[0][1] is not None:
+        print(
+            f"login screen:  {statistics.median(r[1] for r in results) * 1000:.0f} ms"
+        )
+    else:
+        print("login screen:  skipped, no display")
+
+    print("\nSlowest imports:")
+    for us, module in slowest_imports():
+        print(f"{us / 1000:8.1f} ms  {module}")
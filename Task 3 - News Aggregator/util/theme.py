@@ -11,9 +11,14 @@ class Theme:
         self.root = root
         self.root.tk.call("source", os.path.join(ASSET, "void.tcl"))
 
-        for i in ["dark", "light"]:
-            self.root.tk.call("init", i, os.path.join(ASSET, i))
-
+        # Each theme loads its own image set, the other one is loaded on first toggle
+        self.loaded = set()
+        self.set_theme(theme)
+
+    def set_theme(self, theme):
+        if theme not in self.loaded:
+            self.root.tk.call("init", theme, os.path.join(ASSET, theme))
+            self.loaded.add(theme)
         self.root.tk.call("set_theme", theme)
 
     def toggle_theme(self):
@@ -22,7 +27,7 @@ class Theme:
         else:
             t = "dark"
 
-        self.root.tk.call("set_theme", t)
+        self.set_theme(t)
 
         with open(THEME_FILE, "rb+") as f:
             pickle.dump(t, f)
@@ -0,0 +1,152 @@
+import hashlib
+import os
+import threading
+from io import BytesIO
+
+from PIL import Image, ImageFile
+
+from util.workers import run_cpu
+
+THUMBNAIL_SIZE = (250, 175)
+MAX_PIXELS = 25_000_000  # after draft, larger images are not decoded
+
+CACHE_DIR = os.path.join(os.curdir, "assets", ".cache", "thumbnails")
+CACHE_LIMIT = 32 * 1024 * 1024  # bytes of thumbnails kept on disk
+PRUNE_EVERY = 50  # saves between checks of the cache size
+
+_saves = 0
+# LOAD_TRUNCATED_IMAGES is global to Pillow, only set it around one decode at a time
+_truncated_lock = threading.Lock()
+
+
+def cache_path(url):
+    return os.path.join(CACHE_DIR, hashlib.sha1(url.encode()).hexdigest() + ".jpg")
+
+
+def make_thumbnail(data, size=THUMBNAIL_SIZE):
+    """
+    Decodes image bytes straight to thumbnail size.
+
+    JPEGs are decoded with draft(), which lets libjpeg scale down by up to
+    8x while decoding instead of decoding the full resolution image.
+    Progressive JPEGs that download_image cut short are decoded from the
+    scans that arrived; any other truncated image raises.
+
+    Args:
+        data (bytes): Encoded image
+        size (tuple, optional): Thumbnail size. Defaults to THUMBNAIL_SIZE.
+
+    Returns:
+        PIL.Image.Image: RGB thumbnail
+    """
+
+    def open_image():
+        im = Image.open(BytesIO(data))
+        im.draft("RGB", size)
+        if im.size[0] * im.size[1] > MAX_PIXELS:
+            raise ValueError(f"Image too large to decode: {im.size[0]}x{im.size[1]}")
+        return im
+
+    im = open_image()
+    try:
+        im.load()
+    except OSError:
+        if not im.info.get("progressive"):
+            raise
+        with _truncated_lock:
+            previous = ImageFile.LOAD_TRUNCATED_IMAGES
+            ImageFile.LOAD_TRUNCATED_IMAGES = True
+            try:
+                im = open_image()
+                im.load()
+            finally:
+                ImageFile.LOAD_TRUNCATED_IMAGES = previous
+    return im.convert("RGB").resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+
+def load_cached(url):
+    """
+    Loads a previously built thumbnail.
+
+    Args:
+        url (str): Image URL
+
+    Returns:
+        PIL.Image.Image: The thumbnail, or None if it isn't cached
+    """
+    try:
+        im = Image.open(cache_path(url))
+        im.load()
+        os.utime(cache_path(url))  # the mtime is the last use, for prune_cache
+        return im
+    except (OSError, ValueError):
+        return None
+
+
+def prune_cache(limit=CACHE_LIMIT):
+    """
+    Deletes the least recently used thumbnails once the cache is over its limit.
+
+    Args:
+        limit (int, optional): Bytes to keep. Defaults to CACHE_LIMIT.
+    """
+    files = []
+    for entry in os.scandir(CACHE_DIR):
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue  # deleted by another worker
+        files.append((stat.st_mtime, stat.st_size, entry.path))
+    excess = sum(i[1] for i in files) - limit
+    for _, size, path in sorted(files):
+        if excess <= 0:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        excess -= size
+
+
+def save_cached(url, im):
+    global _saves
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    im.save(cache_path(url), "JPEG", quality=85, optimize=True)
+    _saves += 1
+    if _saves % PRUNE_EVERY == 1:
+        prune_cache()
+
+
+def build_thumbnail(url, data):
+    """
+    Builds and caches the thumbnail of downloaded image bytes.
+    Runs in a worker process when the process pool is enabled.
+
+    Args:
+        url (str): Image URL
+        data (bytes): Encoded image
+
+    Returns:
+        bytes: Raw RGB pixels of the thumbnail
+    """
+    im = make_thumbnail(data)
+    save_cached(url, im)
+    return im.tobytes()
+
+
+def get_thumbnail(url, download):
+    """
+    Gets the thumbnail for an image URL, from the cache if possible.
+
+    Args:
+        url (str): Image URL
+        download (callable): Returns the encoded image bytes, only called on a cache miss
+
+    Returns:
+        PIL.Image.Image: The thumbnail
+    """
+    im = load_cached(url)
+    if im is None:
+        raw = run_cpu(build_thumbnail, url, download())
+        im = Image.frombuffer("RGB", THUMBNAIL_SIZE, raw, "raw", "RGB", 0, 1)
+    return im
@@ -0,0 +1,43 @@
+from concurrent.futures import ProcessPoolExecutor
+
+_pool = None
+
+
+def enable_process_pool(max_workers=None):
+    """
+    Moves CPU heavy work (feed parsing, image processing) into worker processes,
+    so it doesn't compete with the Tk main loop for the GIL.
+
+    Args:
+        max_workers (int, optional): Number of processes. Defaults to None (CPU count).
+
+    Returns:
+        None
+    """
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=max_workers)
+
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def run_cpu(fn, *args):
+    """
+    Runs fn(*args) in the process pool if it is enabled, in the calling thread otherwise.
+    fn has to be a module level function and its arguments and result picklable,
+    e.g. bytes and plain dicts.
+
+    Args:
+        fn (callable): Function to run
+
+    Returns:
+        The result of fn
+    """
+    if _pool is None:
+        return fn(*args)
+    return _pool.submit(fn, *args).result()
@@ -1,53 +1,107 @@
-import random
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
 
-import requests
-from bs4 import BeautifulSoup
+from util.downloader import download
+from util.workers import run_cpu
 
 
-def get_soup(url):
-    response = requests.get(
-        url, headers={"Referer": "https://www.google.com/", "User-Agent": "Mozilla/5.0"}
-    )
-    soup = BeautifulSoup(response.content, "xml")
-    return soup
+def get_soup(url, kind="html", until=None):
+    return make_soup(download(url, kind, until))
+
+
+def make_soup(content):
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(content, "xml")
 
 
 def remove_cdata(text: str):
     return text.replace("<![CDATA[", "").replace("]]>", "").strip()
 
 
-def get_articles_from_rss(url, limit=15):
+def parse_pub_date(text):
+    """
+    Parses the RFC 822 pubDate of an rss item.
+
+    Args:
+        text (str): The pubDate text.
+
+    Returns:
+        str: ISO 8601 timestamp, or None if the date could not be parsed.
+    """
+    try:
+        return parsedate_to_datetime(remove_cdata(text)).isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
+def get_articles_from_rss(url, limit=None):
     """
     Parses the XML data from the news websites.
 
     Args:
         url (str): The URL of the rss feed.
-        limit (int): The number of articles to return.
+        limit (int, optional): The maximum number of articles to return, in feed order. Defaults to None (all).
 
     Returns:
-        list: A list of dictionaries. [{'title': '...', 'link': '...', 'image': '...'}, ...]
+        list: A list of dictionaries. [{'title': '...', 'link': '...', 'image': '...', 'published': '...', 'source': '...'}, ...]
     """
-    soup = get_soup(url)
+    return run_cpu(parse_rss, download(url, "feed"), url, limit)
+
+
+def parse_rss(content, url, limit=None):
+    """
+    Parses the downloaded XML of an rss feed. Runs in a worker process when the process pool is enabled.
+
+    Args:
+        content (bytes): The XML data.
+        url (str): The URL of the rss feed.
+        limit (int, optional): The maximum number of articles to return. Defaults to None (all).
+
+    Returns:
+        list: A list of dictionaries, see get_articles_from_rss.
+    """
+    soup = make_soup(content)
     items = soup.find_all("item")
-    if len(items) > limit:
-        items = random.sample(items, limit)
-    else:
-        print(url)
+    if limit is not None:
+        items = items[:limit]
     news = []
     for item in items:
         d = {
             "title": remove_cdata(item.title.text),
             "link": remove_cdata(item.link.text),
+            "published": parse_pub_date(item.pubDate.text) if item.pubDate else None,
+            "source": urlparse(url).netloc,
         }
         try:
             if "https://timesofindia.indiatimes.com" in url:
                 d["image"] = item.enclosure["url"]
             elif "http://feeds.bbci.co.uk" in url:
-                s = get_soup(d["link"])
-                d["image"] = s.find("meta", property="og:image")["content"]
+                # Needs a request per article, resolved only for ranked articles
+                d["image"] = None
             else:
                 d["image"] = item.find("media:content")["url"]
         except TypeError:
             d["image"] = soup.find("image").url.text
         news.append(d)
     return news
+
+
+def resolve_image(article):
+    """
+    Fills in the image of an article whose feed does not carry one.
+
+    Args:
+        article (dict): Article dictionary from get_articles_from_rss.
+
+    Returns:
+        dict: The same article, with 'image' set.
+    """
+    if article.get("image") is None:
+        try:
+            # og:image is in the head, the body isn't needed
+            s = get_soup(article["link"], until=b"</head>")
+            article["image"] = s.find("meta", property="og:image").get("content", "")
+        except (AttributeError, TypeError, OSError):
+            article["image"] = ""
+    return article